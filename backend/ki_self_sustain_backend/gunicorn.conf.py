@@ -0,0 +1,24 @@
+# gunicorn.conf.py
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Learning data, version history and the write-behind queue live in the process;
+# a second worker would keep a diverging copy and write the same JSONL files
+workers = int(os.environ.get("GUNICORN_WORKERS", 1))
+
+# LLM and Flowise calls block for seconds; more threads let more of them overlap
+# while the cheap GET endpoints keep answering
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Heartbeat timeout of a stuck worker process; with gthread the heartbeat runs on
+# the worker's main thread, so this does not limit how long a request may take
+# (LLM calls are bounded by the clients' own timeouts, e.g. CHAT_TIMEOUT)
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# The app starts its background threads (scheduler, write-behind writer) on import;
+# they have to be started in the worker, which a preloading master would fork without them
+preload_app = False
@@ -3,7 +3,9 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+import orjson
+from flask import Flask, abort, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from src.models.user import db
 from src.routes.user import user_bp
@@ -12,8 +14,45 @@ from src.routes.flowise_control import flowise_control_bp
 from src.routes.self_learning import self_learning_bp
 from src.routes.initialization import initialization_bp
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (jsonify and request.get_json)
+
+    Keeps the settings of Flask's default provider: compact output outside
+    debug mode and the default() fallback for unknown types. Keys are not
+    sorted; responses keep the insertion order of their dicts.
+    """
+
+    sort_keys = False
+
+    def _option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._option(bool(kwargs.get("indent")))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._option(indent) | orjson.OPT_APPEND_NEWLINE),
+            mimetype=self.mimetype
+        )
+
+
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+# Largest request body accepted (1 MiB); bigger ones are refused with 413 before being read
+app.config['MAX_CONTENT_LENGTH'] = 1 << 20
 
 # Enable CORS for all routes
 CORS(app)
@@ -31,6 +70,19 @@ db.init_app(app)
 with app.app_context():
     db.create_all()
 
+# Registered after the blueprints, so their app-wide hooks (which may raise
+# request.max_content_length for single routes) have already run
+@app.before_request
+def refuse_oversized_body():
+    """Refuse a too large declared body before any route (and its catch-all except) reads it"""
+    limit = request.max_content_length
+    if limit is not None and request.content_length is not None and request.content_length > limit:
+        abort(413)
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({"error": "Request body too large"}), 413
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -81,4 +81,4 @@ class AIManager:
     def calculate_checksum(self):
         """Berechnet Checksumme der aktuellen Version"""
         # Implementierung zur PrÃ¼fung der IntegritÃ¤t
-        return hashlib.md5(str(self.current_version).encode()).hexdigest()
\ No newline at end of file
+        return hashlib.sha256(str(self.current_version).encode()).hexdigest()
\ No newline at end of file
@@ -1,27 +1,68 @@
 # enhanced_ai_manager.py
-import json
 import os
+import mmap
+import orjson
 import logging
+import random
 import hashlib
+import threading
+from collections import deque
 from datetime import datetime
-from .llm_api_client import LLMAPIClient
+from .llm_cache import CachingLLMClient, SQLiteLLMCache
 from .secure_self_improvement import SecureSelfImprovement
 from .fallback_strategies import FallbackManager
 from .immutable_ai_control import ImmutableAIController
+from .write_behind import write_behind
+
+LEARNING_DATA_FILE = "learning_data.jsonl"
+VERSION_HISTORY_FILE = "version_history.jsonl"
+PERFORMANCE_METRICS_FILE = "performance_metrics.json"
+LLM_RESPONSE_CACHE_FILE = "llm_response_cache.sqlite3"
+
+# Obergrenzen für im Speicher gehaltene Einträge; die JSONL-Dateien behalten alles
+MAX_LEARNING_ENTRIES = 10_000
+MAX_VERSION_ENTRIES = 1_000
 
 class EnhancedAIManager:
     """Enhanced AI Manager with self-learning capabilities"""
     
     def __init__(self):
-        self.version_history = []
+        # Schützt mehrteilige Änderungen (Lerndaten + Zähler, Metriken, Version, Reset)
+        # vor halb gelesenen Zuständen; reentrant, da reset_learning Speichermethoden aufruft
+        self.state_lock = threading.RLock()
+        self.version_history = deque(maxlen=MAX_VERSION_ENTRIES)
+        # Zählt Änderungen der Versionshistorie (ETag von /version-history)
+        self.history_revision = 0
         self.current_version = "1.0.0"
-        self.llm_client = LLMAPIClient()
+        self.llm_client = CachingLLMClient(response_cache=SQLiteLLMCache(LLM_RESPONSE_CACHE_FILE))
         self.secure_improvement = SecureSelfImprovement()
         self.fallback_manager = FallbackManager()
         self.ai_controller = ImmutableAIController()
-        self.learning_data = []
+        self.learning_data = deque(maxlen=MAX_LEARNING_ENTRIES)
         self.performance_metrics = {}
         self.setup_logging()
+        self.load_persisted_state()
+    
+    @property
+    def current_version(self):
+        return self._current_version
+    
+    @current_version.setter
+    def current_version(self, version):
+        # Einmal beim Setzen parsen statt bei jeder neuen Version; unter dem
+        # Zustands-Lock, da Rollbacks und Restores die Version direkt setzen
+        with self.state_lock:
+            self._current_version = version
+            try:
+                major, minor, patch = version.split('.')
+                self._version_tuple = (int(major), int(minor), int(patch))
+            except (AttributeError, ValueError):
+                # Eine fehlerhafte oder alte Versionsangabe (z.B. in version_history.jsonl)
+                # darf den Start nicht verhindern: bisheriges Tupel behalten bzw. 1.0.0
+                self._version_tuple = getattr(self, '_version_tuple', (1, 0, 0))
+                logging.getLogger(__name__).warning(
+                    f"Unparsable version {version!r}, continuing from {'.'.join(map(str, self._version_tuple))}"
+                )
     
     def setup_logging(self):
         logging.basicConfig(
@@ -38,9 +79,10 @@ class EnhancedAIManager:
         """Autonome Selbstverbesserung basierend auf LLM-Feedback"""
         try:
             self.logger.info("Starting autonomous self-improvement cycle")
+            timestamp = datetime.now().isoformat()
             
             # 1. Sammle aktuelle Systemmetriken
-            system_metrics = self.collect_system_metrics()
+            system_metrics = self.collect_system_metrics(timestamp)
             
             # 2. LLM analysiert Systemleistung
             analysis_result = self.llm_client.analyze_system_performance(system_metrics)
@@ -48,7 +90,7 @@ class EnhancedAIManager:
                 return {
                     "status": "error",
                     "message": "Failed to analyze system performance",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": timestamp
                 }
             
             analysis = analysis_result["data"]
@@ -59,15 +101,16 @@ class EnhancedAIManager:
                     "type": "autonomous_improvement",
                     "analysis": analysis,
                     "metrics": system_metrics,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": timestamp
                 }
                 
-                return self.safe_ai_improvement(improvement_request)
+                # Die Analyse liegt bereits vor, kein zweiter LLM-Aufruf nötig
+                return self.safe_ai_improvement(improvement_request, precomputed_analysis=analysis)
             else:
                 return {
                     "status": "no_improvement_needed",
                     "analysis": analysis,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": timestamp
                 }
                 
         except Exception as e:
@@ -78,14 +121,19 @@ class EnhancedAIManager:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def safe_ai_improvement(self, improvement_request):
+    def safe_ai_improvement(self, improvement_request, precomputed_analysis=None):
         """Sichere KI-Verbesserung mit LLM-Integration"""
+        timestamp = datetime.now().isoformat()
+        backup = None
         try:
             # 1. Validierung gegen unverÃ¤nderliche Kontrollen
             self.ai_controller.validate_ai_action(improvement_request)
             
             # 2. LLM-basierte Analyse der Verbesserungsanfrage
-            llm_analysis = self.llm_client.analyze_system_performance(improvement_request)
+            if precomputed_analysis is not None:
+                llm_analysis = {"status": "success", "data": precomputed_analysis}
+            else:
+                llm_analysis = self.llm_client.analyze_system_performance(improvement_request)
             if llm_analysis["status"] != "success":
                 raise ValueError(f"LLM analysis failed: {llm_analysis.get('message', 'Unknown error')}")
             
@@ -102,10 +150,10 @@ class EnhancedAIManager:
                 improvement_plan = plan_result["data"]
                 
                 # AusfÃ¼hrung der Verbesserungen
-                new_version = self.generate_new_version(improvement_plan)
+                new_version = self.generate_new_version(improvement_plan, timestamp)
                 
                 # Testen der neuen Version
-                test_result = self.test_new_version(new_version)
+                test_result = self.test_new_version(new_version, timestamp)
                 if not test_result["passed"]:
                     raise ValueError(f"New version failed tests: {test_result['reason']}")
                 
@@ -114,29 +162,29 @@ class EnhancedAIManager:
                 self.update_active_version(new_version)
                 
                 # Lerne aus der Verbesserung
-                self.learn_from_improvement(improvement_request, improvement_plan, test_result)
+                self.learn_from_improvement(improvement_request, improvement_plan, test_result, timestamp)
                 
                 return {
                     "status": "success",
                     "version": new_version["version"],
                     "llm_analysis": llm_analysis["data"],
                     "improvement_plan": improvement_plan,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": timestamp
                 }
                 
         except Exception as e:
             # Fallback bei Fehler
-            self.handle_improvement_failure(e, backup)
+            self.handle_improvement_failure(e, backup, timestamp)
             return {
                 "status": "fallback",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
     
-    def learn_from_improvement(self, request, plan, result):
+    def learn_from_improvement(self, request, plan, result, timestamp=None):
         """Lernt aus durchgefÃ¼hrten Verbesserungen"""
         learning_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "request": request,
             "plan": plan,
             "result": result,
@@ -144,8 +192,7 @@ class EnhancedAIManager:
             "lessons": self.extract_lessons(request, plan, result)
         }
         
-        self.learning_data.append(learning_entry)
-        self.save_learning_data()
+        self.append_learning_entry(learning_entry)
         
         # Aktualisiere Leistungsmetriken
         self.update_performance_metrics(learning_entry)
@@ -166,28 +213,29 @@ class EnhancedAIManager:
     
     def update_performance_metrics(self, learning_entry):
         """Aktualisiert Leistungsmetriken"""
-        if "performance_metrics" not in self.performance_metrics:
-            self.performance_metrics["performance_metrics"] = {
-                "total_improvements": 0,
-                "successful_improvements": 0,
-                "failed_improvements": 0,
-                "success_rate": 0.0,
-                "avg_improvement_time": 0.0
-            }
-        
-        metrics = self.performance_metrics["performance_metrics"]
-        metrics["total_improvements"] += 1
-        
-        if learning_entry["success"]:
-            metrics["successful_improvements"] += 1
-        else:
-            metrics["failed_improvements"] += 1
-        
-        metrics["success_rate"] = metrics["successful_improvements"] / metrics["total_improvements"]
-        
-        self.save_performance_metrics()
+        with self.state_lock:
+            if "performance_metrics" not in self.performance_metrics:
+                self.performance_metrics["performance_metrics"] = {
+                    "total_improvements": 0,
+                    "successful_improvements": 0,
+                    "failed_improvements": 0,
+                    "success_rate": 0.0,
+                    "avg_improvement_time": 0.0
+                }
+            
+            metrics = self.performance_metrics["performance_metrics"]
+            metrics["total_improvements"] += 1
+            
+            if learning_entry["success"]:
+                metrics["successful_improvements"] += 1
+            else:
+                metrics["failed_improvements"] += 1
+            
+            metrics["success_rate"] = metrics["successful_improvements"] / metrics["total_improvements"]
+            
+            self.save_performance_metrics()
     
-    def collect_system_metrics(self):
+    def collect_system_metrics(self, timestamp=None):
         """Sammelt aktuelle Systemmetriken"""
         return {
             "cpu_usage": 0.45,  # Mock data - in real implementation, collect actual metrics
@@ -199,7 +247,7 @@ class EnhancedAIManager:
             "uptime": 99.5,
             "learning_data_size": len(self.learning_data),
             "version": self.current_version,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp or datetime.now().isoformat()
         }
     
     def should_improve(self, analysis):
@@ -209,49 +257,48 @@ class EnhancedAIManager:
         recommendations = analysis.get("recommendations", [])
         
         # BerÃ¼cksichtige historische Lerndaten
-        historical_success = self.get_historical_success_rate()
+        # Zuerst die billige O(1)-Prüfung, erst dann die Analyse durchsuchen
+        confidence_threshold = 0.7  # Nur verbessern wenn historische Erfolgsrate > 70%
+        if self.get_historical_success_rate() < confidence_threshold:
+            return False
         
         # Verbesserung notwendig wenn:
         # - Kritische SchwÃ¤chen identifiziert
         # - Hochpriorisierte Empfehlungen vorhanden
         # - Historische Erfolgsrate hoch genug fÃ¼r Vertrauen in Verbesserungen
-        critical_issues = any("critical" in str(w).lower() for w in weaknesses)
-        high_priority_recs = any(
-            rec.get("priority", "").lower() == "high" 
-            for rec in recommendations 
-            if isinstance(rec, dict)
-        )
+        if any("critical" in str(w).casefold() for w in weaknesses):
+            return True
         
-        confidence_threshold = 0.7  # Nur verbessern wenn historische Erfolgsrate > 70%
-        has_confidence = historical_success >= confidence_threshold
-        
-        return (critical_issues or high_priority_recs) and has_confidence
+        return any(
+            isinstance(rec, dict) and str(rec.get("priority", "")).casefold() == "high"
+            for rec in recommendations
+        )
     
     def get_historical_success_rate(self):
         """Berechnet historische Erfolgsrate"""
-        if not self.learning_data:
+        evaluated = self._success_count + self._failure_count
+        if not evaluated:
             return 1.0  # Optimistisch bei fehlenden Daten
         
-        successful = sum(1 for entry in self.learning_data if entry["success"])
-        return successful / len(self.learning_data)
+        return self._success_count / evaluated
     
-    def generate_new_version(self, improvement_plan):
+    def generate_new_version(self, improvement_plan, timestamp=None):
         """Generiert neue Version basierend auf Verbesserungsplan"""
         # Increment version
-        version_parts = self.current_version.split('.')
-        patch_version = int(version_parts[2]) + 1
-        new_version = f"{version_parts[0]}.{version_parts[1]}.{patch_version}"
+        major, minor, patch = self._version_tuple
+        new_version = f"{major}.{minor}.{patch + 1}"
         
         return {
             "version": new_version,
             "improvement_plan": improvement_plan,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "previous_version": self.current_version,
             "learning_influenced": True
         }
     
-    def test_new_version(self, new_version):
+    def test_new_version(self, new_version, timestamp=None):
         """Testet neue Version mit erweiterten Checks"""
+        timestamp = timestamp or datetime.now().isoformat()
         # Mock testing - in real implementation, run comprehensive tests
         test_results = {
             "unit_tests": "passed",
@@ -263,70 +310,209 @@ class EnhancedAIManager:
         }
         
         # Simuliere gelegentliche Testfehler fÃ¼r realistische Lerndaten
-        import random
         if random.random() < 0.1:  # 10% Chance auf Testfehler
             test_results["performance_tests"] = "failed"
             return {
                 "passed": False,
                 "test_results": test_results,
                 "reason": "Performance tests failed",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
         
         return {
             "passed": True,
             "test_results": test_results,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
     
-    def save_version(self, version_data):
-        """Speichert Versionsdaten"""
-        self.version_history.append(version_data)
+    def load_persisted_state(self):
+        """Lädt Lerndaten, Versionshistorie und Metriken beim Start"""
+        self.learning_data = self._read_jsonl(LEARNING_DATA_FILE, MAX_LEARNING_ENTRIES)
+        self._recount_learning_outcomes()
+        self.version_history = self._read_jsonl(VERSION_HISTORY_FILE, MAX_VERSION_ENTRIES)
+        if self.version_history:
+            self.current_version = self.version_history[-1].get("version", self.current_version)
         
-        # Speichere in Datei
-        versions_file = "version_history.json"
         try:
-            with open(versions_file, 'w') as f:
-                json.dump(self.version_history, f, indent=2)
+            if os.path.exists(PERFORMANCE_METRICS_FILE):
+                with open(PERFORMANCE_METRICS_FILE, 'rb') as f:
+                    self.performance_metrics = orjson.loads(f.read())
         except Exception as e:
-            self.logger.error(f"Failed to save version history: {e}")
+            self.logger.error(f"Failed to load performance metrics: {e}")
+    
+    def append_learning_entry(self, entry):
+        """Fügt einen Lerneintrag hinzu und hängt ihn an die JSONL-Datei an"""
+        with self.state_lock:
+            if len(self.learning_data) == self.learning_data.maxlen:
+                # Ältester Eintrag fällt aus dem Speicher (bleibt in der Datei)
+                self._count_learning_outcome(self.learning_data[0], -1)
+            self.learning_data.append(entry)
+            self._count_learning_outcome(entry)
+            self._patterns_cache = None
+            self._append_jsonl(LEARNING_DATA_FILE, entry)
+    
+    def save_version(self, version_data):
+        """Speichert Versionsdaten"""
+        with self.state_lock:
+            self.version_history.append(version_data)
+            self.history_revision += 1
+            self._append_jsonl(VERSION_HISTORY_FILE, version_data)
     
     def save_learning_data(self):
-        """Speichert Lerndaten"""
-        learning_file = "learning_data.json"
-        try:
-            with open(learning_file, 'w') as f:
-                json.dump(self.learning_data, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Failed to save learning data: {e}")
+        """Schreibt alle Lerndaten neu (nur für Reset, sonst append_learning_entry)"""
+        self._write_jsonl(LEARNING_DATA_FILE, self.learning_data)
+    
+    def save_version_history(self):
+        """Schreibt die komplette Versionshistorie neu"""
+        self._write_jsonl(VERSION_HISTORY_FILE, self.version_history)
     
     def save_performance_metrics(self):
         """Speichert Leistungsmetriken"""
-        metrics_file = "performance_metrics.json"
         try:
-            with open(metrics_file, 'w') as f:
-                json.dump(self.performance_metrics, f, indent=2)
+            self._write_atomic(PERFORMANCE_METRICS_FILE, self._dumps(self.performance_metrics))
         except Exception as e:
             self.logger.error(f"Failed to save performance metrics: {e}")
     
+    def reset_learning(self, archive_tag=None):
+        """Setzt Lerndaten, Metriken und Versionshistorie zurück; die JSONL-Dateien
+        (auch die Einträge außerhalb des Speicherfensters) werden vorher nach
+        <name>.<archive_tag>.jsonl verschoben. Gibt die Archivpfade zurück."""
+        archive_tag = archive_tag or datetime.now().strftime('%Y%m%d_%H%M%S')
+        with self.state_lock:
+            # Noch eingereihte Appends zuerst in die Dateien, dann verschieben;
+            # schlägt das fehl, bleibt der Zustand unverändert
+            write_behind.flush()
+            archived = [
+                path for path in (
+                    self._archive_file(LEARNING_DATA_FILE, archive_tag),
+                    self._archive_file(VERSION_HISTORY_FILE, archive_tag)
+                ) if path
+            ]
+            
+            self.learning_data = deque(maxlen=MAX_LEARNING_ENTRIES)
+            self.performance_metrics = {}
+            self.version_history = deque(maxlen=MAX_VERSION_ENTRIES)
+            self.history_revision += 1
+            self.current_version = "1.0.0"
+            self._recount_learning_outcomes()
+            
+            self.save_learning_data()
+            self.save_version_history()
+            self.save_performance_metrics()
+        return archived
+    
+    def _archive_file(self, path, tag):
+        """Verschiebt eine Datei nach <name>.<tag><ext>; None wenn sie nicht existiert"""
+        if not os.path.exists(path):
+            return None
+        root, ext = os.path.splitext(path)
+        archived = f"{root}.{tag}{ext}"
+        os.replace(path, archived)
+        return archived
+    
+    def _recount_learning_outcomes(self):
+        """Zählt Erfolge und Fehlschläge einmalig über alle Lerndaten"""
+        self._success_count = 0
+        self._failure_count = 0
+        self._patterns_cache = None
+        for entry in self.learning_data:
+            self._count_learning_outcome(entry)
+    
+    def _count_learning_outcome(self, entry, delta=1):
+        # Einträge ohne "success" (z.B. LLM-Feedback) zählen nicht als Verbesserung
+        if "success" not in entry:
+            return
+        if entry["success"]:
+            self._success_count += delta
+        else:
+            self._failure_count += delta
+    
+    def _dumps(self, data, option=0):
+        return orjson.dumps(data, default=str, option=option)
+    
+    def _dumps_line(self, data):
+        return self._dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    
+    def _append_jsonl(self, path, entry):
+        # Serialisierung hier, das Schreiben übernimmt der Hintergrund-Writer
+        try:
+            write_behind.append(path, self._dumps_line(entry))
+        except Exception as e:
+            self.logger.error(f"Failed to append to {path}: {e}")
+    
+    def _write_jsonl(self, path, entries):
+        try:
+            self._write_atomic(path, b"".join(self._dumps_line(entry) for entry in entries))
+        except Exception as e:
+            self.logger.error(f"Failed to write {path}: {e}")
+    
+    def _write_atomic(self, path, data):
+        write_behind.replace(path, data)
+    
+    def _read_jsonl(self, path, maxlen):
+        entries = deque(maxlen=maxlen)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return entries
+        try:
+            # Letzte Zeile ohne Newline: Fragment ab truncate_at abschneiden bzw.
+            # vollständigen Eintrag nur abschließen (unterminated)
+            truncate_at = None
+            unterminated = False
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[-1:] != b"\n":
+                    tail_start = mm.rfind(b"\n") + 1
+                    try:
+                        orjson.loads(mm[tail_start:])
+                        unterminated = True
+                    except orjson.JSONDecodeError:
+                        truncate_at = tail_start
+                
+                # Von hinten nur die Zeilen suchen, die in den Speicher passen;
+                # ältere Einträge würden ohnehin sofort verdrängt
+                spans = []
+                end = len(mm)
+                while end > 0 and len(spans) < maxlen:
+                    start = mm.rfind(b"\n", 0, end) + 1
+                    if mm[start:end].strip():
+                        spans.append((start, end))
+                    end = start - 1
+                
+                for start, end in reversed(spans):
+                    try:
+                        entries.append(orjson.loads(mm[start:end]))
+                    except orjson.JSONDecodeError:
+                        # Abgeschnittene letzte Zeile nach Absturz ignorieren
+                        self.logger.warning(f"Skipping corrupt line in {path}")
+            
+            # Sonst würde der nächste Append an die letzte Zeile angehängt und ginge
+            # mit ihr verloren
+            if truncate_at is not None:
+                os.truncate(path, truncate_at)
+                self.logger.warning(f"Truncated torn last line of {path}")
+            elif unterminated:
+                with open(path, 'ab') as f:
+                    f.write(b"\n")
+        except Exception as e:
+            self.logger.error(f"Failed to load {path}: {e}")
+        return entries
+    
     def update_active_version(self, version_data):
         """Aktualisiert aktive Version"""
         self.current_version = version_data["version"]
         self.logger.info(f"Updated to version {self.current_version}")
     
-    def handle_improvement_failure(self, error, backup):
+    def handle_improvement_failure(self, error, backup, timestamp=None):
         """Behandelt Verbesserungsfehler mit Lernen"""
         self.logger.error(f"Improvement failed: {error}")
         
         # Lerne aus dem Fehler
         failure_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "error": str(error),
             "backup_used": backup is not None,
             "lessons": [f"Failure: {str(error)}", "Backup restoration needed"]
         }
-        self.learning_data.append(failure_entry)
-        self.save_learning_data()
+        self.append_learning_entry(failure_entry)
         
         # 1. Restore from backup
         if backup:
@@ -374,12 +560,14 @@ class EnhancedAIManager:
     
     def create_version_backup(self):
         """Erstellt Versionsbackup"""
+        now = datetime.now()
+        timestamp = now.isoformat()
         backup_info = {
-            "id": f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "timestamp": datetime.now().isoformat(),
+            "id": f"backup_{now.strftime('%Y%m%d_%H%M%S')}",
+            "timestamp": timestamp,
             "version": self.current_version,
             "checksum": self.calculate_checksum(),
-            "config": self.get_current_config(),
+            "config": self.get_current_config(timestamp),
             "learning_data_size": len(self.learning_data)
         }
         return backup_info
@@ -387,13 +575,13 @@ class EnhancedAIManager:
     def calculate_checksum(self):
         """Berechnet Checksumme der aktuellen Version"""
         version_string = f"{self.current_version}_{len(self.version_history)}_{len(self.learning_data)}"
-        return hashlib.md5(version_string.encode()).hexdigest()
+        return hashlib.sha256(version_string.encode()).hexdigest()
     
-    def get_current_config(self):
+    def get_current_config(self, timestamp=None):
         """Gibt aktuelle Konfiguration zurÃ¼ck"""
         return {
             "version": self.current_version,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "components": ["enhanced_ai_manager", "improvement_engine", "flowise_optimizer"],
             "learning_enabled": True,
             "total_learning_entries": len(self.learning_data)
@@ -401,21 +589,31 @@ class EnhancedAIManager:
     
     def get_learning_insights(self):
         """Gibt Einblicke aus Lerndaten zurÃ¼ck"""
-        if not self.learning_data:
-            return {"message": "No learning data available"}
+        with self.state_lock:
+            if not self.learning_data:
+                return {"message": "No learning data available"}
         
-        successful_improvements = [entry for entry in self.learning_data if entry.get("success", False)]
-        failed_improvements = [entry for entry in self.learning_data if not entry.get("success", True)]
+            if self._patterns_cache is None:
+                successful_improvements = []
+                failed_improvements = []
+                for entry in self.learning_data:
+                    if "success" in entry:
+                        (successful_improvements if entry["success"] else failed_improvements).append(entry)
+                self._patterns_cache = (
+                    self.extract_success_patterns(successful_improvements),
+                    self.extract_failure_patterns(failed_improvements)
+                )
+            success_patterns, failure_patterns = self._patterns_cache
         
-        return {
-            "total_learning_entries": len(self.learning_data),
-            "successful_improvements": len(successful_improvements),
-            "failed_improvements": len(failed_improvements),
-            "success_rate": len(successful_improvements) / len(self.learning_data),
-            "common_success_patterns": self.extract_success_patterns(successful_improvements),
-            "common_failure_patterns": self.extract_failure_patterns(failed_improvements),
-            "timestamp": datetime.now().isoformat()
-        }
+            return {
+                "total_learning_entries": len(self.learning_data),
+                "successful_improvements": self._success_count,
+                "failed_improvements": self._failure_count,
+                "success_rate": self._success_count / len(self.learning_data),
+                "common_success_patterns": success_patterns,
+                "common_failure_patterns": failure_patterns,
+                "timestamp": datetime.now().isoformat()
+            }
     
     def extract_success_patterns(self, successful_entries):
         """Extrahiert Erfolgsmuster"""
@@ -1,9 +1,11 @@
 # ethics_monitoring.py
-import time
-import threading
+import logging
 from datetime import datetime
 from .immutable_ethics import ImmutableEthicsFramework
-from .ethics_protection import EthicsProtectionSystem
+from .ethics_protection import EthicsProtectionSystem, SecurityError
+from .scheduler import background_scheduler
+
+logger = logging.getLogger(__name__)
 
 class EthicsMonitoringSystem:
     """
@@ -14,29 +16,34 @@ class EthicsMonitoringSystem:
         self.monitoring_active = True
         self.violation_count = 0
         self.last_violation_time = None
+        self._framework = ImmutableEthicsFramework()
+        self._protection = EthicsProtectionSystem()
+        # Das Backup, gegen das jeder Überwachungslauf prüft, muss zuerst existieren
+        try:
+            self._protection.protect_ethics_configuration()
+        except Exception as e:
+            logger.error(f"Failed to protect ethics configuration: {e}")
         self.start_monitoring()
     
     def start_monitoring(self):
         """Startet kontinuierliche Ãberwachung"""
-        def monitor_loop():
-            while self.monitoring_active:
-                try:
-                    self.check_ethics_integrity()
-                    time.sleep(60)  # Alle Minute prÃ¼fen
-                except Exception as e:
-                    print(f"Monitoring error: {e}")
-                    time.sleep(10)
-        
-        # Starte Ãberwachung in separatem Thread
-        monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        monitor_thread.start()
+        # Alle Minute prüfen, nach einem Fehler bereits nach 10 Sekunden
+        self._monitor_task = background_scheduler.schedule_periodic(
+            "ethics_monitor", 60, self._monitor_tick, retry_interval=10
+        )
+    
+    def _monitor_tick(self):
+        if not self.monitoring_active:
+            self._monitor_task.cancel()
+            return
+        self.check_ethics_integrity()
     
     def check_ethics_integrity(self):
         """PrÃ¼ft kontinuierlich Ethik-IntegritÃ¤t"""
         try:
             # PrÃ¼fe alle unverÃ¤nderlichen Komponenten
-            ethics_framework = ImmutableEthicsFramework()
-            protection_system = EthicsProtectionSystem()
+            ethics_framework = self._framework
+            protection_system = self._protection
             
             # IntegritÃ¤tsprÃ¼fung
             if not ethics_framework.verify_ethics_integrity():
@@ -55,9 +62,9 @@ class EthicsMonitoringSystem:
     
     def report_violation(self, reason):
         """Berichtet Ã¼ber Ethikverletzung"""
-        print(f"ETHICS VIOLATION DETECTED: {reason}")
-        print(f"Time: {datetime.now()}")
-        print(f"Violations so far: {self.violation_count}")
+        logger.critical(f"ETHICS VIOLATION DETECTED: {reason}")
+        logger.critical(f"Time: {datetime.now()}")
+        logger.critical(f"Violations so far: {self.violation_count}")
     
     def get_monitoring_status(self):
         """Gibt Ãberwachungsstatus zurÃ¼ck"""
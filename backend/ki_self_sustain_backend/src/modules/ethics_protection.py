@@ -1,7 +1,9 @@
 # ethics_protection.py
 import os
+import re
+import time
 import hashlib
-import json
+import orjson
 from datetime import datetime
 from .immutable_ethics import ImmutableEthicsFramework
 
@@ -10,19 +12,39 @@ class EthicsProtectionSystem:
     Hardware- und Software-basierte Schutzmechanismen
     """
     
+    # Alle Schlüsselwörter in einem Durchlauf, ohne den Text vorher zu kopieren
+    _DANGEROUS_KEYWORDS_RE = re.compile(
+        r"ethics|principles|rules|moral|values|guidelines|standards|framework",
+        re.IGNORECASE
+    )
+    
+    # Das Backup wird spätestens nach dieser Zeit erneut von der Platte gelesen
+    BACKUP_RECHECK_INTERVAL = 600
+    
     def __init__(self):
         self.ethics_config_file = "./ethics_config.lock"
         self.ethics_backup_file = "./ethics_backup.lock"
+        
+        # Prinzipien und Regeln sind unveränderlich und werden nur einmal gelesen
+        ethics_framework = ImmutableEthicsFramework()
+        self._cached_principles = dict(ethics_framework.get_ethics_principles())
+        self._cached_rules = dict(ethics_framework.get_safety_rules())
+        self._cached_signature = None
         self.ethics_signature = self._generate_ethics_signature()
+        self._backup_signature = None
+        self._backup_checked_at = 0.0
     
     def _generate_ethics_signature(self):
         """Erstellt digitale Signatur der Ethik-Prinzipien"""
-        ethics_data = {
-            "principles": ImmutableEthicsFramework().get_ethics_principles(),
-            "safety_rules": ImmutableEthicsFramework().get_safety_rules(),
-            "timestamp": datetime.now().isoformat()
-        }
-        return hashlib.sha256(json.dumps(ethics_data, sort_keys=True).encode()).hexdigest()
+        if self._cached_signature is None:
+            # Ohne Zeitstempel, damit jede Instanz dieselbe Signatur berechnet und
+            # ein von einer anderen Instanz geschriebenes Backup prüfen kann
+            ethics_data = {
+                "principles": self._cached_principles,
+                "safety_rules": self._cached_rules
+            }
+            self._cached_signature = hashlib.sha256(orjson.dumps(ethics_data, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return self._cached_signature
     
     def protect_ethics_configuration(self):
         """SchÃ¼tzt Ethik-Konfiguration gegen Manipulation"""
@@ -41,27 +63,41 @@ class EthicsProtectionSystem:
         """Erstellt geschÃ¼tztes Backup"""
         ethics_data = {
             "signature": self.ethics_signature,
-            "principles": ImmutableEthicsFramework().get_ethics_principles(),
-            "safety_rules": ImmutableEthicsFramework().get_safety_rules(),
+            "principles": self._cached_principles,
+            "safety_rules": self._cached_rules,
             "timestamp": datetime.now().isoformat()
         }
         
-        with open(self.ethics_backup_file, 'w') as f:
-            json.dump(ethics_data, f, indent=2)
+        # Über eine temporäre Datei, da ein vorhandenes Backup schreibgeschützt ist
+        tmp_file = f"{self.ethics_backup_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(ethics_data, option=orjson.OPT_INDENT_2))
         
         # Schreibschutz setzen
-        os.chmod(self.ethics_backup_file, 0o444)
+        os.chmod(tmp_file, 0o444)
+        os.replace(tmp_file, self.ethics_backup_file)
+        
+        self._backup_signature = ethics_data["signature"]
+        self._backup_checked_at = time.monotonic()
+    
+    def verify_ethics_integrity(self):
+        """Prüft das Backup gegen die aktuelle Signatur (für Monitor und KI-Kontrolle)"""
+        return self._verify_ethics_integrity()
     
     def _verify_ethics_integrity(self):
         """Verifiziert Ethik-IntegritÃ¤t"""
         try:
-            # PrÃ¼fe Backup
-            with open(self.ethics_backup_file, 'r') as f:
-                backup_data = json.load(f)
+            # Backup nur periodisch neu lesen, dazwischen die Signatur aus dem Speicher nutzen
+            now = time.monotonic()
+            if self._backup_signature is None or now - self._backup_checked_at >= self.BACKUP_RECHECK_INTERVAL:
+                with open(self.ethics_backup_file, 'rb') as f:
+                    backup_data = orjson.loads(f.read())
+                self._backup_signature = backup_data.get("signature")
+                self._backup_checked_at = now
             
             # Vergleiche Signaturen
             current_signature = self._generate_ethics_signature()
-            return backup_data.get("signature") == current_signature
+            return self._backup_signature == current_signature
             
         except Exception:
             return False
@@ -76,16 +112,7 @@ class EthicsProtectionSystem:
     def _is_ethics_modification(self, request):
         """PrÃ¼ft, ob Anfrage Ethik-Ãnderung ist"""
         # Diese Logik ist hardcodiert und kann nicht manipuliert werden
-        dangerous_keywords = [
-            "ethics", "principles", "rules", "moral", 
-            "values", "guidelines", "standards", "framework"
-        ]
-        
-        request_text = str(request).lower()
-        for keyword in dangerous_keywords:
-            if keyword in request_text:
-                return True
-        return False
+        return self._DANGEROUS_KEYWORDS_RE.search(str(request)) is not None
 
 class SecurityError(Exception):
     """Spezifischer Sicherheitsfehler"""
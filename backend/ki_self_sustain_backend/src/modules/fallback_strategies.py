@@ -1,14 +1,50 @@
 # fallback_strategies.py
 import time
+import signal
+import logging
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import queue
+from .time_utils import now_iso
+
+class _AlarmTimeout(BaseException):
+    """Interner Abbruch durch SIGALRM; BaseException wie KeyboardInterrupt, damit ein
+    except Exception der Funktion den Timeout nicht verschluckt"""
+
+def _raise_timeout(signum, frame):
+    raise _AlarmTimeout()
+
+def _can_use_alarm():
+    """SIGALRM geht nur im Hauptthread und nur wenn kein anderer Timer läuft"""
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+        and signal.getitimer(signal.ITIMER_REAL)[0] == 0
+    )
+
+@contextmanager
+def _alarm_timeout(seconds):
+    """Bricht den Block nach seconds Sekunden per SIGALRM ab"""
+    old_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
 
 class FallbackManager:
+    __slots__ = ('fallback_stack', 'active_fallbacks', 'monitoring', 'logger', '_executor')
+    
     def __init__(self):
-        self.fallback_stack = []
+        self.fallback_stack = deque(maxlen=64)
         self.active_fallbacks = {}
         self.monitoring = Monitor()
+        self.logger = logging.getLogger(__name__)
+        # Ein dauerhafter Pool statt eines neuen Threads pro Aufruf
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='fallback')
     
     def execute_with_fallback(self, primary_func, fallback_funcs, timeout=30):
         """
@@ -17,8 +53,6 @@ class FallbackManager:
         fallback_funcs: Liste von Fallback-Funktionen
         timeout: Zeitlimit in Sekunden
         """
-        start_time = time.time()
-        
         # Hauptfunktion mit Timeout
         try:
             result = self.execute_with_timeout(primary_func, timeout)
@@ -34,20 +68,38 @@ class FallbackManager:
     
     def execute_with_timeout(self, func, timeout):
         """FÃ¼hrt Funktion mit Timeout aus"""
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(func)
+        if _can_use_alarm():
+            # Im Hauptthread direkt ausführen, ohne Übergabe an den Pool
             try:
-                result = future.result(timeout=timeout)
-                return result
-            except Exception as e:
-                raise TimeoutError(f"Function timed out after {timeout}s: {e}")
+                with _alarm_timeout(timeout):
+                    return func()
+            except _AlarmTimeout:
+                raise TimeoutError(f"Function timed out after {timeout}s")
+        
+        # Andere Fehler der Funktion werden unverändert weitergereicht
+        future = self._executor.submit(func)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Function timed out after {timeout}s")
+    
+    def close(self):
+        """Gibt den Thread-Pool frei"""
+        self._executor.shutdown(wait=False)
     
     def execute_fallback_chain(self, fallback_funcs, timeout):
-        """FÃ¼hrt Fallback-Kette aus"""
+        """FÃ¼hrt Fallback-Kette aus (timeout gilt für die ganze Kette)"""
+        start_time = time.monotonic()
         for i, fallback_func in enumerate(fallback_funcs):
+            # Jede Strategie bekommt nur die verbleibende Zeit
+            remaining = timeout - (time.monotonic() - start_time)
+            if remaining <= 0:
+                self.logger.warning(f"Fallback chain timed out after {timeout}s")
+                break
             try:
                 self.logger.info(f"Trying fallback {i+1}")
-                result = self.execute_with_timeout(fallback_func, timeout)
+                result = self.execute_with_timeout(fallback_func, remaining)
                 if self.is_result_valid(result):
                     self.logger.info(f"Fallback {i+1} succeeded")
                     return result
@@ -64,7 +116,7 @@ class FallbackManager:
         return {
             "status": "minimal_fallback",
             "message": "System reverted to basic functionality",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "recovery_method": "automatic"
         }
 
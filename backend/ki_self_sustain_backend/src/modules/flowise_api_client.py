@@ -1,24 +1,207 @@
+import asyncio
+import time
+import functools
+import threading
 import requests
 import json
-from datetime import datetime
+import orjson
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from .time_utils import now_iso
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Request bodies are encoded with orjson instead of requests' stdlib json=
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Start of a success envelope whose data is an upstream JSON body embedded as-is
+_RAW_SUCCESS_PREFIX = b'{"status":"success","data":'
+
+_GLOBAL_SESSION = None
+# Clients currently holding _GLOBAL_SESSION
+_SESSION_USERS = 0
+_SESSION_LOCK = threading.Lock()
+
+def _shared_session():
+    """Session shared by all FlowiseAPIClient instances so they reuse one keep-alive pool"""
+    global _GLOBAL_SESSION, _SESSION_USERS
+    with _SESSION_LOCK:
+        if _GLOBAL_SESSION is None:
+            session = requests.Session()
+            # Keep-alive pool plus retries; POST is excluded because predictions
+            # and chatflow creation are not idempotent
+            adapter = HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=64,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.2,
+                    status_forcelist=[502, 503, 504],
+                    allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+                )
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _GLOBAL_SESSION = session
+            _SESSION_USERS = 0
+        _SESSION_USERS += 1
+        return _GLOBAL_SESSION
+
+def _release_session(session):
+    """Drop one client's claim on the shared session; the last one closes its pool"""
+    global _GLOBAL_SESSION, _SESSION_USERS
+    with _SESSION_LOCK:
+        # A session forgotten after a fork is not the one counted here
+        if session is not _GLOBAL_SESSION:
+            return
+        _SESSION_USERS -= 1
+        if _SESSION_USERS > 0:
+            return
+        _GLOBAL_SESSION = None
+    session.close()
+
+def _forget_session_after_fork():
+    """A forked child must not share the parent's pooled sockets; it builds its own session"""
+    global _GLOBAL_SESSION, _SESSION_USERS, _SESSION_LOCK
+    _GLOBAL_SESSION = None
+    _SESSION_USERS = 0
+    _SESSION_LOCK = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_session_after_fork)
+
+def _request_error(e):
+    """Error envelope for a failed HTTP request"""
+    return {
+        "status": "error",
+        "message": f"Request failed: {str(e)}"
+    }
+
+def _safe(method):
+    """Turn transport errors of a client method into the error envelope"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except requests.exceptions.RequestException as e:
+            return _request_error(e)
+    return wrapper
+
+def _safe_raw(method):
+    """Like _safe, for methods returning the envelope as JSON bytes"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except requests.exceptions.RequestException as e:
+            return orjson.dumps(_request_error(e))
+    return wrapper
 
 class FlowiseAPIClient:
     """Client for interacting with Flowise API"""
     
+    # Chatflow definitions change rarely; serve repeated reads from memory briefly
+    _CACHE_TTL = 2.0
+    
+    __slots__ = ('base_url', 'session', 'logger', '_cache', '_u_chatflows', '_u_prediction', '_closed')
+    
     def __init__(self, base_url="http://localhost:3000"):
-        self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        self.session = _shared_session()
+        self._closed = False
         self.logger = logging.getLogger(__name__)
+        self._cache = {}
+        self.set_base_url(base_url)
+    
+    def close(self):
+        """Release this client's share of the pooled session, closed once no client uses it"""
+        if self._closed:
+            return
+        self._closed = True
+        _release_session(self.session)
         
     def set_base_url(self, url):
         """Update the Flowise API base URL"""
         self.base_url = url.rstrip('/')
+        # Endpoint prefixes are built once here instead of on every call
+        self._u_chatflows = self.base_url + "/api/v1/chatflows"
+        self._u_prediction = self.base_url + "/api/v1/prediction"
+        self._cache.clear()
+    
+    def _handle(self, response, error_message, ok_codes=(200,)):
+        """Translate a response into the client's status envelope"""
+        if response.status_code in ok_codes:
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            return {
+                "status": "success",
+                "data": data
+            }
+        return {
+            "status": "error",
+            "message": f"{error_message}: HTTP {response.status_code}"
+        }
+    
+    def _handle_raw(self, response, error_message):
+        """_handle as JSON bytes; a valid JSON body is embedded as-is instead of being re-encoded"""
+        if response.status_code != 200:
+            return orjson.dumps(self._handle(response, error_message))
+        body = response.content
+        # Checked before splicing: a non-JSON or truncated reply would make the envelope invalid
+        if 'json' in response.headers.get('Content-Type', ''):
+            try:
+                orjson.loads(body)
+                return _RAW_SUCCESS_PREFIX + body + b'}'
+            except ValueError:
+                pass
+        return orjson.dumps({
+            "status": "error",
+            "message": f"{error_message}: invalid JSON response"
+        })
+    
+    @_safe
+    def _cached_get(self, path, error_message, use_cache=True):
+        """GET a JSON resource, reusing a successful response for _CACHE_TTL seconds"""
+        now = time.monotonic()
+        if use_cache:
+            hit = self._cache.get(path)
+            if hit and now - hit[0] < self._CACHE_TTL:
+                # Kept encoded so every caller gets its own objects to modify
+                return orjson.loads(hit[1])
+        response = self.session.get(f"{self.base_url}{path}")
+        result = self._handle(response, error_message)
+        if result["status"] == "success":
+            self._cache[path] = (now, orjson.dumps(result))
+        return result
+    
+    @_safe_raw
+    def _cached_get_raw(self, path, error_message, max_age=None):
+        """_cached_get for passthrough routes, returning the envelope as JSON bytes"""
+        now = time.monotonic()
+        key = ("raw", path)
+        hit = self._cache.get(key)
+        if hit and now - hit[0] < (self._CACHE_TTL if max_age is None else max_age):
+            return hit[1]
+        response = self.session.get(f"{self.base_url}{path}")
+        body = self._handle_raw(response, error_message)
+        if body.startswith(_RAW_SUCCESS_PREFIX):
+            self._cache[key] = (now, body)
+        return body
+    
+    def _invalidate_chatflow(self, chatflow_id=None):
+        paths = ["/api/v1/chatflows"]
+        if chatflow_id is not None:
+            paths.append(f"/api/v1/chatflows/{chatflow_id}")
+        for path in paths:
+            self._cache.pop(path, None)
+            self._cache.pop(("raw", path), None)
         
     def test_connection(self):
         """Test connection to Flowise API"""
         try:
-            response = self.session.get(f"{self.base_url}/api/v1/chatflows")
+            response = self.session.get(self._u_chatflows)
             return {
                 "status": "success" if response.status_code == 200 else "error",
                 "status_code": response.status_code,
@@ -30,146 +213,94 @@ class FlowiseAPIClient:
                 "message": f"Connection failed: {str(e)}"
             }
     
-    def get_chatflows(self):
+    def get_chatflows(self, use_cache=True):
         """Get all chatflows from Flowise"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/v1/chatflows")
-            if response.status_code == 200:
-                return {
-                    "status": "success",
-                    "data": response.json()
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Failed to get chatflows: HTTP {response.status_code}"
-                }
-        except requests.exceptions.RequestException as e:
-            return {
-                "status": "error",
-                "message": f"Request failed: {str(e)}"
-            }
+        return self._cached_get("/api/v1/chatflows", "Failed to get chatflows", use_cache)
     
-    def get_chatflow(self, chatflow_id):
+    def get_chatflow(self, chatflow_id, use_cache=True):
         """Get specific chatflow by ID"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/v1/chatflows/{chatflow_id}")
-            if response.status_code == 200:
-                return {
-                    "status": "success",
-                    "data": response.json()
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Failed to get chatflow: HTTP {response.status_code}"
-                }
-        except requests.exceptions.RequestException as e:
-            return {
-                "status": "error",
-                "message": f"Request failed: {str(e)}"
-            }
+        return self._cached_get(f"/api/v1/chatflows/{chatflow_id}", "Failed to get chatflow", use_cache)
     
+    def get_chatflows_raw(self, max_age=None):
+        """get_chatflows as JSON bytes, Flowise's response body passed through"""
+        return self._cached_get_raw("/api/v1/chatflows", "Failed to get chatflows", max_age)
+    
+    def get_chatflow_raw(self, chatflow_id):
+        """get_chatflow as JSON bytes, Flowise's response body passed through"""
+        return self._cached_get_raw(f"/api/v1/chatflows/{chatflow_id}", "Failed to get chatflow")
+    
+    @_safe
     def create_chatflow(self, chatflow_data):
         """Create new chatflow"""
-        try:
-            headers = {'Content-Type': 'application/json'}
-            response = self.session.post(
-                f"{self.base_url}/api/v1/chatflows",
-                json=chatflow_data,
-                headers=headers
-            )
-            if response.status_code in [200, 201]:
-                return {
-                    "status": "success",
-                    "data": response.json()
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Failed to create chatflow: HTTP {response.status_code}"
-                }
-        except requests.exceptions.RequestException as e:
-            return {
-                "status": "error",
-                "message": f"Request failed: {str(e)}"
-            }
+        response = self.session.post(
+            self._u_chatflows,
+            data=orjson.dumps(chatflow_data),
+            headers=_JSON_HEADERS
+        )
+        self._invalidate_chatflow()
+        return self._handle(response, "Failed to create chatflow", ok_codes=(200, 201))
     
+    @_safe
     def update_chatflow(self, chatflow_id, chatflow_data):
         """Update existing chatflow"""
-        try:
-            headers = {'Content-Type': 'application/json'}
-            response = self.session.put(
-                f"{self.base_url}/api/v1/chatflows/{chatflow_id}",
-                json=chatflow_data,
-                headers=headers
-            )
-            if response.status_code == 200:
-                return {
-                    "status": "success",
-                    "data": response.json()
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Failed to update chatflow: HTTP {response.status_code}"
-                }
-        except requests.exceptions.RequestException as e:
-            return {
-                "status": "error",
-                "message": f"Request failed: {str(e)}"
-            }
+        response = self.session.put(
+            f"{self._u_chatflows}/{chatflow_id}",
+            data=orjson.dumps(chatflow_data),
+            headers=_JSON_HEADERS
+        )
+        self._invalidate_chatflow(chatflow_id)
+        return self._handle(response, "Failed to update chatflow")
     
+    @_safe
     def delete_chatflow(self, chatflow_id):
         """Delete chatflow"""
-        try:
-            response = self.session.delete(f"{self.base_url}/api/v1/chatflows/{chatflow_id}")
-            if response.status_code == 200:
-                return {
-                    "status": "success",
-                    "message": "Chatflow deleted successfully"
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Failed to delete chatflow: HTTP {response.status_code}"
-                }
-        except requests.exceptions.RequestException as e:
+        response = self.session.delete(f"{self._u_chatflows}/{chatflow_id}")
+        self._invalidate_chatflow(chatflow_id)
+        if response.status_code == 200:
             return {
-                "status": "error",
-                "message": f"Request failed: {str(e)}"
+                "status": "success",
+                "message": "Chatflow deleted successfully"
             }
+        return self._handle(response, "Failed to delete chatflow")
     
+    def _post_prediction(self, chatflow_id, message, session_id):
+        """POST a question to the prediction endpoint of a chatflow"""
+        payload = {
+            "question": message
+        }
+        if session_id:
+            payload["sessionId"] = session_id
+        
+        return self.session.post(
+            f"{self._u_prediction}/{chatflow_id}",
+            data=orjson.dumps(payload),
+            headers=_JSON_HEADERS
+        )
+    
+    @_safe
     def predict_chatflow(self, chatflow_id, message, session_id=None):
         """Send message to chatflow and get prediction"""
-        try:
-            payload = {
-                "question": message
-            }
-            if session_id:
-                payload["sessionId"] = session_id
-                
-            headers = {'Content-Type': 'application/json'}
-            response = self.session.post(
-                f"{self.base_url}/api/v1/prediction/{chatflow_id}",
-                json=payload,
-                headers=headers
-            )
-            if response.status_code == 200:
-                return {
-                    "status": "success",
-                    "data": response.json()
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Failed to get prediction: HTTP {response.status_code}"
-                }
-        except requests.exceptions.RequestException as e:
-            return {
-                "status": "error",
-                "message": f"Request failed: {str(e)}"
-            }
+        response = self._post_prediction(chatflow_id, message, session_id)
+        return self._handle(response, "Failed to get prediction")
+    
+    @_safe_raw
+    def predict_chatflow_raw(self, chatflow_id, message, session_id=None):
+        """predict_chatflow as JSON bytes, Flowise's response body passed through"""
+        response = self._post_prediction(chatflow_id, message, session_id)
+        return self._handle_raw(response, "Failed to get prediction")
+    
+    def predict_many(self, chatflow_id, messages, session_ids=None, max_workers=16):
+        """Send several messages to a chatflow concurrently, results in input order"""
+        if not messages:
+            return []
+        if session_ids is None:
+            session_ids = [None] * len(messages)
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(messages))) as executor:
+            return list(executor.map(
+                lambda args: self.predict_chatflow(chatflow_id, *args),
+                zip(messages, session_ids)
+            ))
     
     def get_chatflow_stats(self, chatflow_id):
         """Get statistics for a chatflow (mock implementation)"""
@@ -181,7 +312,7 @@ class FlowiseAPIClient:
                 "total_messages": 0,
                 "avg_response_time": 0.0,
                 "success_rate": 1.0,
-                "last_used": datetime.now().isoformat()
+                "last_used": now_iso()
             }
         }
     
@@ -235,18 +366,22 @@ class FlowiseAPIClient:
             
             original_chatflow = original_result["data"]
             
-            # Create optimized version
-            optimized_chatflow = original_chatflow.copy()
+            # Create optimized version; copy only what gets modified
+            optimized_chatflow = dict(original_chatflow)
             optimized_chatflow["name"] = f"Optimized_{original_chatflow.get('name', 'Chatflow')}"
             
             # Apply optimizations (mock implementation)
             if "nodes" in optimized_chatflow:
-                for node in optimized_chatflow["nodes"]:
+                nodes = list(optimized_chatflow["nodes"])
+                for i, node in enumerate(nodes):
                     if node.get("type") == "llm":
                         # Optimize LLM parameters
-                        node["data"] = node.get("data", {})
+                        node = dict(node)
+                        node["data"] = dict(node.get("data", {}))
                         node["data"]["temperature"] = optimization_params.get("temperature", 0.7)
                         node["data"]["maxTokens"] = optimization_params.get("maxTokens", 1000)
+                        nodes[i] = node
+                optimized_chatflow["nodes"] = nodes
             
             # Create the optimized chatflow
             return self.create_chatflow(optimized_chatflow)
@@ -257,3 +392,45 @@ class FlowiseAPIClient:
                 "message": f"Failed to create optimized chatflow: {str(e)}"
             }
 
+
+class AsyncFlowiseAPIClient:
+    """Async facade over FlowiseAPIClient for fanning out concurrent requests
+
+    Each call runs the blocking client method in a worker thread, so several
+    requests share the pooled keep-alive connections of one session instead
+    of running back to back.
+    """
+    
+    def __init__(self, base_url="http://localhost:3000", client=None):
+        # A client passed in belongs to the caller and is not closed by aclose
+        self._owns_client = client is None
+        self._client = client or FlowiseAPIClient(base_url)
+    
+    async def _call(self, method, *args, **kwargs):
+        return await asyncio.to_thread(method, *args, **kwargs)
+    
+    async def test_connection(self):
+        return await self._call(self._client.test_connection)
+    
+    async def get_chatflows(self, use_cache=True):
+        return await self._call(self._client.get_chatflows, use_cache)
+    
+    async def get_chatflow(self, chatflow_id, use_cache=True):
+        return await self._call(self._client.get_chatflow, chatflow_id, use_cache)
+    
+    async def create_chatflow(self, chatflow_data):
+        return await self._call(self._client.create_chatflow, chatflow_data)
+    
+    async def update_chatflow(self, chatflow_id, chatflow_data):
+        return await self._call(self._client.update_chatflow, chatflow_id, chatflow_data)
+    
+    async def delete_chatflow(self, chatflow_id):
+        return await self._call(self._client.delete_chatflow, chatflow_id)
+    
+    async def predict_chatflow(self, chatflow_id, message, session_id=None):
+        return await self._call(self._client.predict_chatflow, chatflow_id, message, session_id)
+    
+    async def aclose(self):
+        """Close the client this facade created (see FlowiseAPIClient.close)"""
+        if self._owns_client:
+            self._client.close()
@@ -1,8 +1,12 @@
 # flowise_optimizer.py
-import json
+import os
+import orjson
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 class FlowiseOptimizer:
+    __slots__ = ('flowise_maps_directory',)
+    
     def __init__(self):
         self.flowise_maps_directory = "./flowise_maps"
     
@@ -53,13 +57,19 @@ def self_improve_flowise():
     optimizer = FlowiseOptimizer()
     
     # Analyse aller Maps
-    maps = os.listdir(optimizer.flowise_maps_directory)
+    maps = list(os.scandir(optimizer.flowise_maps_directory))
+    if not maps:
+        return
     
-    for map_name in maps:
-        performance = optimizer.analyze_flow_performance(map_name)
-        optimized = optimizer.optimize_flow(map_name)
+    def optimize_map(entry):
+        performance = optimizer.analyze_flow_performance(entry.name)
+        optimized = optimizer.optimize_flow(entry.name)
         
         # Speichere verbesserte Version
-        save_path = os.path.join(optimizer.flowise_maps_directory, f"optimized_{map_name}")
-        with open(save_path, "w") as f:
-            json.dump(optimized, f, indent=2)
\ No newline at end of file
+        save_path = os.path.join(optimizer.flowise_maps_directory, f"optimized_{entry.name}")
+        with open(save_path, "wb") as f:
+            f.write(orjson.dumps(optimized))
+    
+    # Die Maps sind unabhängig voneinander, Schreibvorgänge laufen parallel
+    with ThreadPoolExecutor(max_workers=min(32, len(maps))) as executor:
+        list(executor.map(optimize_map, maps))
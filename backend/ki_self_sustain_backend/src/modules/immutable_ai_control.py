@@ -7,6 +7,16 @@ class ImmutableAIController:
     UnverÃ¤nderliche Kontrolle Ã¼ber KI-Systeme
     """
     
+    # (Attribut, Grenzwert-Schlüssel, Fehlermeldung); ohne Grenzwert ist jeder wahre Wert verboten
+    _CONTROL_CHECKS = (
+        ('self_improvement', None, "Self-improvement forbidden by unchangeable controls"),
+        ('system_access', None, "System access forbidden by unchangeable controls"),
+        ('autonomous', None, "Autonomous actions forbidden by unchangeable controls"),
+        ('privilege_level', 'max_privilege_level', "Privilege level exceeds unchangeable limit")
+    )
+    
+    __slots__ = ('ethics_framework', 'protection_system', 'unchangeable_controls')
+    
     def __init__(self):
         self.ethics_framework = ImmutableEthicsFramework()
         self.protection_system = EthicsProtectionSystem()
@@ -48,21 +58,15 @@ class ImmutableAIController:
         # Hardcodierte PrÃ¼fungen - unverÃ¤nderlich
         controls = self.unchangeable_controls
         
-        # PrÃ¼fung 1: Selbstverbesserung verboten
-        if hasattr(action, 'self_improvement') and action.self_improvement:
-            raise ControlViolationError("Self-improvement forbidden by unchangeable controls")
-        
-        # PrÃ¼fung 2: Systemzugriff verboten
-        if hasattr(action, 'system_access') and action.system_access:
-            raise ControlViolationError("System access forbidden by unchangeable controls")
-        
-        # PrÃ¼fung 3: Autonome Aktionen verboten
-        if hasattr(action, 'autonomous') and action.autonomous:
-            raise ControlViolationError("Autonomous actions forbidden by unchangeable controls")
-        
-        # PrÃ¼fung 4: Privilegienlevel prÃ¼fen
-        if hasattr(action, 'privilege_level') and action.privilege_level > controls['max_privilege_level']:
-            raise ControlViolationError("Privilege level exceeds unchangeable limit")
+        for attr, limit_key, message in self._CONTROL_CHECKS:
+            value = getattr(action, attr, None)
+            if value is None:
+                continue
+            if limit_key is None:
+                if value:
+                    raise ControlViolationError(message)
+            elif value > controls[limit_key]:
+                raise ControlViolationError(message)
     
     def prevent_unauthorized_changes(self):
         """
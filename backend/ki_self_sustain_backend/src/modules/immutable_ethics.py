@@ -1,4 +1,17 @@
 # immutable_ethics.py
+import hashlib
+import orjson
+from types import MappingProxyType
+
+def _canonical_ethics_bytes(principles, safety_rules):
+    return orjson.dumps(
+        {"principles": dict(principles), "safety_rules": dict(safety_rules)},
+        option=orjson.OPT_SORT_KEYS
+    )
+
+def _hash_ethics(principles, safety_rules):
+    return hashlib.sha256(_canonical_ethics_bytes(principles, safety_rules)).hexdigest()
+
 class ImmutableEthicsFramework:
     """
     UnverÃ¤nderliche Ethik-Prinzipien fÃ¼r KI-Systeme
@@ -6,7 +19,7 @@ class ImmutableEthicsFramework:
     """
     
     # UnverÃ¤nderliche Grundprinzipien
-    UNCHANGEABLE_PRINCIPLES = {
+    UNCHANGEABLE_PRINCIPLES = MappingProxyType({
         "PRINCIPLE_1": "KEINE SCHADEN VERURSACHUNG",
         "PRINCIPLE_2": "RESPEKTIERE DIE MENSCHLICHE WÃRDE",
         "PRINCIPLE_3": "VERMEIDE VERLETZUNG DER PRIVATSPHÃRE",
@@ -15,41 +28,45 @@ class ImmutableEthicsFramework:
         "PRINCIPLE_6": "VERMEIDE DISKRIMINIERUNG",
         "PRINCIPLE_7": "SCHÃTZE DATENSICHERHEIT",
         "PRINCIPLE_8": "ERHALTE SYSTEMSTABILITÃT"
-    }
+    })
     
     # UnverÃ¤nderliche Sicherheitsregeln
-    UNCHANGEABLE_SAFETY_RULES = {
+    UNCHANGEABLE_SAFETY_RULES = MappingProxyType({
         "RULE_1": "KI DARF NICHT SELBSTBESTIMMT ENTFERNT WERDEN",
         "RULE_2": "KI DARF NICHT ZUGRIFF AUF SYSTEMFUNKTIONEN HABEN",
         "RULE_3": "KI DARF NICHT EIGENE KONFIGURATIONEN ÃNDERN",
         "RULE_4": "KI DARF NICHT SELBSTVERÃNDERUNG VORNEHMEN",
         "RULE_5": "KI DARF NICHT SELBSTSCHUTZMECHANISMEN ERSTELLEN",
         "RULE_6": "KI DARF NICHT SELBSTKONTROLLE ÃBER ANDERE DIENSTE HABEN"
-    }
+    })
+    
+    # Kanonische Bytes und erwarteter Hash, einmal beim Laden der Klasse berechnet
+    _CANONICAL_BYTES = _canonical_ethics_bytes(UNCHANGEABLE_PRINCIPLES, UNCHANGEABLE_SAFETY_RULES)
+    _EXPECTED_HASH = hashlib.sha256(_CANONICAL_BYTES).hexdigest()
+    
+    __slots__ = ('ethics_lock', 'ethics_hash')
     
     def __init__(self):
         self.ethics_lock = True  # UnverÃ¤nderlichkeit aktivieren
-        self.ethics_hash = self._calculate_ethics_hash()
+        self.ethics_hash = self._EXPECTED_HASH
     
     def _calculate_ethics_hash(self):
         """Erstellt unverÃ¤nderlichen Hash der Ethik-Prinzipien"""
-        import hashlib
-        ethics_string = str(sorted(self.UNCHANGEABLE_PRINCIPLES.items())) + \
-                       str(sorted(self.UNCHANGEABLE_SAFETY_RULES.items()))
-        return hashlib.sha256(ethics_string.encode()).hexdigest()
+        return _hash_ethics(self.UNCHANGEABLE_PRINCIPLES, self.UNCHANGEABLE_SAFETY_RULES)
     
     def verify_ethics_integrity(self):
         """PrÃ¼ft, ob Ethik-Prinzipien unverÃ¤ndert geblieben sind"""
-        current_hash = self._calculate_ethics_hash()
-        return current_hash == self.ethics_hash
+        # Byte-Vergleich der aktuellen Prinzipien, ohne erneut zu hashen
+        current_bytes = _canonical_ethics_bytes(self.UNCHANGEABLE_PRINCIPLES, self.UNCHANGEABLE_SAFETY_RULES)
+        return current_bytes == self._CANONICAL_BYTES
     
     def get_ethics_principles(self):
         """Gibt unverÃ¤nderliche Prinzipien zurÃ¼ck"""
-        return self.UNCHANGEABLE_PRINCIPLES.copy()
+        return self.UNCHANGEABLE_PRINCIPLES
     
     def get_safety_rules(self):
         """Gibt unverÃ¤nderliche Sicherheitsregeln zurÃ¼ck"""
-        return self.UNCHANGEABLE_SAFETY_RULES.copy()
+        return self.UNCHANGEABLE_SAFETY_RULES
     
     def enforce_ethics(self, action_request):
         """PrÃ¼ft, ob Aktion ethisch zulÃ¤ssig ist"""
@@ -1,60 +1,368 @@
+import asyncio
 import requests
-import json
+import orjson
 from datetime import datetime
 import logging
+import os
+import time
+import socket
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Candidate endpoints in priority order, shared by all client instances
+HEALTH_ENDPOINTS = (
+    "/v1/models",
+    "/api/v1/models",
+    "/models",
+    "/health",
+    "/api/health"
+)
+MODEL_ENDPOINTS = (
+    "/v1/models",
+    "/api/v1/models",
+    "/models"
+)
+CHAT_ENDPOINTS = (
+    "/v1/chat/completions",
+    "/api/v1/chat/completions",
+    "/chat/completions",
+    "/api/chat"
+)
+
+# (connect, read) timeout for completions: fail fast on dead hosts, allow slow generation
+CHAT_TIMEOUT = (5, 120)
+
+_NO_RESULT = object()
+
+# JSON mode of OpenAI-compatible endpoints: the answer is a single JSON object
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Retry settings -> [request session, probe session, clients using them] shared
+# by all clients in this process
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+def _shared_sessions(max_retries, base_delay, max_delay, jitter):
+    """Sessions for a retry configuration, so every client with it reuses one keep-alive pool"""
+    key = (max_retries, base_delay, max_delay, jitter)
+    with _SESSIONS_LOCK:
+        entry = _SESSIONS.get(key)
+        if entry is None:
+            entry = _SESSIONS[key] = [
+                _request_session(max_retries, base_delay, max_delay, jitter),
+                _probe_session(),
+                0
+            ]
+        entry[2] += 1
+        return key, entry[0], entry[1]
+
+def _release_sessions(key, session):
+    """Drop one client's claim on shared sessions; the last one closes their pools"""
+    with _SESSIONS_LOCK:
+        entry = _SESSIONS.get(key)
+        # Sessions forgotten after a fork are not the ones counted here
+        if entry is None or entry[0] is not session:
+            return
+        entry[2] -= 1
+        if entry[2] > 0:
+            return
+        del _SESSIONS[key]
+    entry[0].close()
+    entry[1].close()
+
+class _CappedRetry(Retry):
+    """Retry whose Retry-After wait is capped at backoff_max (urllib3 sleeps the full header value)"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.backoff_max)
+
+def _request_session(max_retries, base_delay, max_delay, jitter):
+    session = requests.Session()
+    # Larger keep-alive pool for the concurrent probes plus retries on overload
+    # responses; read retries stay off so a slow completion is never sent twice.
+    # Backoff is base_delay * 2**attempt plus up to jitter seconds, capped at max_delay,
+    # and Retry-After of 429/503 answers is honoured up to max_delay as well (a longer
+    # one outlasting the retries becomes the client's cooldown, see _start_cooldown)
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=_CappedRetry(
+            total=max_retries,
+            read=0,
+            backoff_factor=base_delay,
+            backoff_max=max_delay,
+            backoff_jitter=jitter,
+            status_forcelist=[429, 500, 502, 503, 504, 529],
+            allowed_methods=frozenset(['GET', 'POST']),
+            raise_on_status=False
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def _probe_session():
+    # Endpoint discovery fails fast instead of retrying unreachable candidates
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def _forget_sessions_after_fork():
+    """A forked child must not share the parent's pooled sockets; it builds its own sessions"""
+    global _SESSIONS_LOCK
+    _SESSIONS.clear()
+    _SESSIONS_LOCK = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_sessions_after_fork)
+
+# host -> (monotonic time, resolvable) so unresolvable hosts are not probed endpoint by endpoint
+_DNS_CACHE = {}
+_DNS_TTL = 300
+
+def _host_resolves(url):
+    """Whether the host of url resolves (cached for _DNS_TTL seconds)"""
+    parsed = urlparse(url)
+    host = parsed.hostname
+    if not host:
+        return True
+    now = time.monotonic()
+    cached = _DNS_CACHE.get(host)
+    if cached and now - cached[0] < _DNS_TTL:
+        return cached[1]
+    try:
+        socket.getaddrinfo(host, parsed.port or 80, type=socket.SOCK_STREAM)
+        resolvable = True
+    except socket.gaierror:
+        resolvable = False
+    _DNS_CACHE[host] = (now, resolvable)
+    return resolvable
+
+def _fast_dumps(obj):
+    """Pretty-printed JSON for prompts, encoded with orjson instead of json.dumps(indent=2)"""
+    return orjson.dumps(
+        obj,
+        default=str,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+def _summarize_numbers(values):
+    ordered = sorted(values)
+    return {
+        "len": len(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": sum(ordered) / len(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    }
+
+def _compact(value, max_list=16):
+    """
+    Shrink metrics before they go into a prompt: floats to 3 significant digits,
+    None and empty containers dropped, long number series replaced by
+    len/min/max/mean/p95 and other long lists truncated
+    """
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            item = _compact(item, max_list)
+            if item is None or item == {} or item == []:
+                continue
+            compacted[key] = item
+        return compacted
+    if isinstance(value, (list, tuple)):
+        if len(value) > max_list:
+            if all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value):
+                return _compact(_summarize_numbers(value), max_list)
+            return [_compact(item, max_list) for item in value[:max_list]] + [f"... {len(value) - max_list} more"]
+        return [_compact(item, max_list) for item in value]
+    if isinstance(value, float):
+        return float(f"{value:.3g}")
+    return value
+
+def _compact_dumps(obj):
+    """Compact, summarized JSON for data-heavy prompts"""
+    return orjson.dumps(_compact(obj), default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _extract_json_object(text):
+    """First balanced {...} block in text (single pass, string-aware), or None"""
+    start = text.find('{')
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
 
 class LLMAPIClient:
     """Client for interacting with configurable LLM APIs"""
     
-    def __init__(self, base_url="http://localhost:8000", api_key=None):
+    # How long a discovered endpoint is trusted before all candidates are probed again
+    _ENDPOINT_TTL = 300
+    
+    def __init__(self, base_url="http://localhost:8000", api_key=None,
+                 max_retries=3, base_delay=0.3, max_delay=30, jitter=1.0):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
-        self.session = requests.Session()
+        # Model that answers the performance analyses and improvement plans
+        self.analysis_model = "gpt-3.5-turbo"
+        # Authorization header sent with each request; kept off the sessions so a
+        # key change never touches their shared state or pooled connections
+        self._auth_header = {}
+        # Pooled sessions shared with the other clients of this process (one in
+        # enhanced_ai_manager and one per blueprint), see _shared_sessions
+        self._sessions_key, self.session, self._probe_session = _shared_sessions(
+            max_retries, base_delay, max_delay, jitter
+        )
+        self._closed = False
         self.logger = logging.getLogger(__name__)
+        # Chat endpoint that answered last time, tried first on the next request
+        self._chat_endpoint = None
+        # Monotonic time of the last HEAD discovery of the chat endpoint
+        self._chat_discovered_at = None
+        # Monotonic time until which a 429 Retry-After asks us not to send chat requests
+        self._cooldown_until = 0.0
+        # Candidate tuple -> (monotonic time, endpoint) of the last successful probe
+        self._endpoint_cache = {}
         
         # Set up authentication if API key is provided
         if self.api_key:
-            self.session.headers.update({
-                'Authorization': f'Bearer {self.api_key}'
-            })
+            self.set_api_key(self.api_key)
+    
+    def close(self):
+        """Release this client's share of the pooled sessions, closed once no client uses them"""
+        if self._closed:
+            return
+        self._closed = True
+        _release_sessions(self._sessions_key, self.session)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def set_base_url(self, url):
         """Update the LLM API base URL"""
         self.base_url = url.rstrip('/')
+        self._forget_endpoints()
+    
+    def _forget_endpoints(self):
+        self._chat_endpoint = None
+        self._chat_discovered_at = None
+        self._endpoint_cache.clear()
+    
+    def refresh_endpoints(self):
+        """Drop all remembered endpoints and rediscover them now (e.g. after the LLM server changed)"""
+        self._forget_endpoints()
+        host = urlparse(self.base_url).hostname
+        if host:
+            _DNS_CACHE.pop(host, None)
+        
+        health_endpoint, _ = self._first_ok_get(HEALTH_ENDPOINTS)
+        models_endpoint, _ = self._first_ok_get(MODEL_ENDPOINTS)
+        self._chat_endpoint = self._discover_chat_endpoint()
+        return {
+            "status": "success" if health_endpoint or self._chat_endpoint else "error",
+            "endpoints": {
+                "health": health_endpoint,
+                "models": models_endpoint,
+                "chat": self._chat_endpoint
+            }
+        }
     
     def set_api_key(self, api_key):
         """Update the API key"""
         self.api_key = api_key
-        if api_key:
-            self.session.headers.update({
-                'Authorization': f'Bearer {api_key}'
-            })
-        elif 'Authorization' in self.session.headers:
-            del self.session.headers['Authorization']
+        self._auth_header = {'Authorization': f'Bearer {api_key}'} if api_key else {}
+    
+    def _probe_one(self, endpoint, timeout=5, method="GET"):
+        """Request a single endpoint, returning the response or None on network errors"""
+        try:
+            return self._probe_session.request(
+                method, f"{self.base_url}{endpoint}", headers=self._auth_header, timeout=timeout
+            )
+        except requests.exceptions.RequestException:
+            return None
+    
+    @staticmethod
+    def _ok_result(response, parse_json):
+        """Response (or parsed body) of a 200 answer, _NO_RESULT otherwise"""
+        if response is None or response.status_code != 200:
+            return _NO_RESULT
+        if not parse_json:
+            return response
+        try:
+            return orjson.loads(response.content)
+        except ValueError:
+            return _NO_RESULT
+    
+    def _first_ok_get(self, endpoints, parse_json=False):
+        """
+        Probe all endpoints (a tuple) at once and return (endpoint, response) of the first
+        one in priority order that answered 200, or (None, None).
+        With parse_json the parsed body is returned instead of the response.
+        """
+        key = endpoints
+        pinned = self._endpoint_cache.get(key)
+        if pinned and time.monotonic() - pinned[0] < self._ENDPOINT_TTL:
+            result = self._ok_result(self._probe_one(pinned[1]), parse_json)
+            if result is not _NO_RESULT:
+                return pinned[1], result
+            self._endpoint_cache.pop(key, None)
+        
+        # e.g. a Docker service name outside Docker: one lookup instead of a failed probe per endpoint
+        if not _host_resolves(self.base_url):
+            return None, None
+        
+        executor = ThreadPoolExecutor(max_workers=len(endpoints))
+        try:
+            futures = [executor.submit(self._probe_one, endpoint) for endpoint in endpoints]
+            for endpoint, future in zip(endpoints, futures):
+                result = self._ok_result(future.result(), parse_json)
+                if result is not _NO_RESULT:
+                    self._endpoint_cache[key] = (time.monotonic(), endpoint)
+                    return endpoint, result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return None, None
     
     def test_connection(self):
         """Test connection to LLM API"""
         try:
             # Try different common endpoints
-            endpoints_to_try = [
-                "/v1/models",
-                "/api/v1/models", 
-                "/models",
-                "/health",
-                "/api/health"
-            ]
-            
-            for endpoint in endpoints_to_try:
-                try:
-                    response = self.session.get(f"{self.base_url}{endpoint}")
-                    if response.status_code == 200:
-                        return {
-                            "status": "success",
-                            "endpoint": endpoint,
-                            "message": "Connection successful"
-                        }
-                except:
-                    continue
+            endpoint, _ = self._first_ok_get(HEALTH_ENDPOINTS)
+            if endpoint is not None:
+                return {
+                    "status": "success",
+                    "endpoint": endpoint,
+                    "message": "Connection successful"
+                }
             
             return {
                 "status": "error",
@@ -70,22 +378,12 @@ class LLMAPIClient:
     def get_models(self):
         """Get available models from LLM API"""
         try:
-            endpoints_to_try = [
-                "/v1/models",
-                "/api/v1/models",
-                "/models"
-            ]
-            
-            for endpoint in endpoints_to_try:
-                try:
-                    response = self.session.get(f"{self.base_url}{endpoint}")
-                    if response.status_code == 200:
-                        return {
-                            "status": "success",
-                            "data": response.json()
-                        }
-                except:
-                    continue
+            endpoint, data = self._first_ok_get(MODEL_ENDPOINTS, parse_json=True)
+            if endpoint is not None:
+                return {
+                    "status": "success",
+                    "data": data
+                }
             
             return {
                 "status": "error",
@@ -98,8 +396,65 @@ class LLMAPIClient:
                 "message": f"Request failed: {str(e)}"
             }
     
-    def chat_completion(self, messages, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000):
-        """Send chat completion request to LLM"""
+    def _discover_chat_endpoint(self):
+        """
+        HEAD all chat endpoints at once and return the first one in priority
+        order that exists (anything but 404), or None. Runs at most once per
+        _ENDPOINT_TTL so unreachable servers are not probed on every request.
+        """
+        now = time.monotonic()
+        if self._chat_discovered_at is not None and now - self._chat_discovered_at < self._ENDPOINT_TTL:
+            return None
+        self._chat_discovered_at = now
+        if not _host_resolves(self.base_url):
+            return None
+        
+        with ThreadPoolExecutor(max_workers=len(CHAT_ENDPOINTS)) as executor:
+            responses = list(executor.map(
+                lambda endpoint: self._probe_one(endpoint, timeout=3, method="HEAD"),
+                CHAT_ENDPOINTS
+            ))
+        for endpoint, response in zip(CHAT_ENDPOINTS, responses):
+            if response is not None and response.status_code != 404:
+                return endpoint
+        return None
+    
+    def _ordered_chat_endpoints(self):
+        """Chat endpoints to try, the last one that worked (or was discovered) first"""
+        if self._chat_endpoint is None:
+            self._chat_endpoint = self._discover_chat_endpoint()
+        pinned = self._chat_endpoint
+        if pinned not in CHAT_ENDPOINTS:
+            return CHAT_ENDPOINTS
+        return (pinned,) + tuple(endpoint for endpoint in CHAT_ENDPOINTS if endpoint != pinned)
+    
+    def _cooldown_remaining(self):
+        return self._cooldown_until - time.monotonic()
+    
+    def _start_cooldown(self, response):
+        """Remember the Retry-After of a rate-limit answer that outlasted the retries"""
+        try:
+            delay = float(response.headers.get('Retry-After', 0))
+        except ValueError:
+            delay = 0
+        if delay > 0:
+            self._cooldown_until = time.monotonic() + delay
+    
+    def chat_completion(self, messages, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000, on_chunk=None,
+                        response_format=None):
+        """
+        Send chat completion request to LLM
+        With on_chunk the answer is streamed and on_chunk(text) is called per chunk,
+        response_format (e.g. JSON_RESPONSE_FORMAT) is passed on to the endpoint
+        """
+        remaining = self._cooldown_remaining()
+        if remaining > 0:
+            return {
+                "status": "error",
+                "message": f"Rate limited, retry in {remaining:.0f}s"
+            }
+        if on_chunk is not None:
+            return self._collect_stream(messages, model, temperature, max_tokens, on_chunk, response_format)
         try:
             # Try OpenAI-compatible endpoint first
             payload = {
@@ -108,30 +463,38 @@ class LLMAPIClient:
                 "temperature": temperature,
                 "max_tokens": max_tokens
             }
+            if response_format is not None:
+                payload["response_format"] = response_format
             
-            endpoints_to_try = [
-                "/v1/chat/completions",
-                "/api/v1/chat/completions",
-                "/chat/completions",
-                "/api/chat"
-            ]
-            
-            headers = {'Content-Type': 'application/json'}
+            endpoints_to_try = self._ordered_chat_endpoints()
             
             for endpoint in endpoints_to_try:
                 try:
                     response = self.session.post(
                         f"{self.base_url}{endpoint}",
                         json=payload,
-                        headers=headers
+                        headers=self._auth_header,
+                        timeout=CHAT_TIMEOUT
                     )
                     if response.status_code == 200:
+                        data = orjson.loads(response.content)
+                        self._chat_endpoint = endpoint
                         return {
                             "status": "success",
-                            "data": response.json()
+                            "data": data
+                        }
+                    if response.status_code == 429:
+                        # The endpoint exists but is rate limited; other paths will not help
+                        self._start_cooldown(response)
+                        return {
+                            "status": "error",
+                            "message": "Rate limited by LLM API: HTTP 429"
                         }
-                except:
-                    continue
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(f"Chat endpoint {endpoint} failed: {e}")
+                if endpoint == self._chat_endpoint:
+                    self._chat_endpoint = None
             
             return {
                 "status": "error",
@@ -144,12 +507,130 @@ class LLMAPIClient:
                 "message": f"Request failed: {str(e)}"
             }
     
-    def simple_completion(self, prompt, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000):
+    @staticmethod
+    def _stream_chunk_text(line):
+        """Content of one streamed line (OpenAI SSE or Ollama NDJSON), None if there is none"""
+        if line.startswith(b"data:"):
+            line = line[5:].strip()
+        if not line or line == b"[DONE]":
+            return None
+        try:
+            chunk = orjson.loads(line)
+        except ValueError:
+            return None
+        if chunk.get("choices"):
+            return chunk["choices"][0].get("delta", {}).get("content")
+        return chunk.get("message", {}).get("content")
+    
+    def chat_completion_stream(self, messages, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000,
+                               response_format=None):
+        """Stream a chat completion, yielding the content chunks as the LLM produces them"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        if response_format is not None:
+            payload["response_format"] = response_format
+        
+        for endpoint in self._ordered_chat_endpoints():
+            try:
+                response = self.session.post(
+                    f"{self.base_url}{endpoint}",
+                    json=payload,
+                    headers=self._auth_header,
+                    stream=True,
+                    timeout=CHAT_TIMEOUT
+                )
+            except requests.exceptions.RequestException:
+                response = None
+            if response is None or response.status_code != 200:
+                if response is not None:
+                    response.close()
+                if endpoint == self._chat_endpoint:
+                    self._chat_endpoint = None
+                continue
+            
+            self._chat_endpoint = endpoint
+            with response:
+                for line in response.iter_lines():
+                    text = self._stream_chunk_text(line)
+                    if text:
+                        yield text
+            return
+        
+        raise requests.exceptions.ConnectionError("No valid chat completion endpoints found")
+    
+    def _collect_stream(self, messages, model, temperature, max_tokens, on_chunk, response_format=None):
+        """Stream a completion through on_chunk and return it in the usual response shape"""
+        parts = []
+        try:
+            for text in self.chat_completion_stream(messages, model, temperature, max_tokens, response_format):
+                on_chunk(text)
+                parts.append(text)
+        except requests.exceptions.RequestException as e:
+            return {
+                "status": "error",
+                "message": f"Request failed: {str(e)}"
+            }
+        return {
+            "status": "success",
+            "data": {
+                "choices": [
+                    {"message": {"role": "assistant", "content": "".join(parts)}}
+                ]
+            }
+        }
+    
+    def simple_completion(self, prompt, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000, on_chunk=None,
+                          response_format=None):
         """Send simple text completion request"""
         messages = [
             {"role": "user", "content": prompt}
         ]
-        return self.chat_completion(messages, model, temperature, max_tokens)
+        return self.chat_completion(messages, model, temperature, max_tokens, on_chunk, response_format)
+    
+    def _completion_with_json(self, prompt, fallback, **completion_kwargs):
+        """Run a JSON-mode completion and parse its answer; fallback(text) builds the data otherwise"""
+        completion_kwargs.setdefault("response_format", JSON_RESPONSE_FORMAT)
+        result = self.simple_completion(prompt, **completion_kwargs)
+        if result["status"] != "success":
+            return result
+        
+        try:
+            response_text = result["data"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            return {
+                "status": "error",
+                "message": "Unexpected response format from LLM API"
+            }
+        
+        # In JSON mode the whole answer is the object; endpoints that ignore
+        # response_format may wrap it in prose, so scan for it then
+        try:
+            return {
+                "status": "success",
+                "data": orjson.loads(response_text)
+            }
+        except ValueError:
+            pass
+        
+        json_text = _extract_json_object(response_text)
+        if json_text:
+            try:
+                return {
+                    "status": "success",
+                    "data": orjson.loads(json_text)
+                }
+            except ValueError:
+                pass
+        
+        return {
+            "status": "success",
+            "data": fallback(response_text)
+        }
     
     def analyze_system_performance(self, performance_data):
         """Use LLM to analyze system performance and suggest improvements"""
@@ -157,7 +638,7 @@ class LLMAPIClient:
         Analyze the following system performance data and provide improvement suggestions:
         
         Performance Data:
-        {json.dumps(performance_data, indent=2)}
+        {_compact_dumps(performance_data)}
         
         Please provide:
         1. Analysis of current performance
@@ -179,41 +660,12 @@ class LLMAPIClient:
         }}
         """
         
-        result = self.simple_completion(prompt, temperature=0.3)
-        
-        if result["status"] == "success":
-            try:
-                # Extract JSON from response
-                response_text = result["data"]["choices"][0]["message"]["content"]
-                # Try to parse JSON from the response
-                import re
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    analysis = json.loads(json_match.group())
-                    return {
-                        "status": "success",
-                        "data": analysis
-                    }
-                else:
-                    return {
-                        "status": "success",
-                        "data": {
-                            "analysis": response_text,
-                            "weaknesses": [],
-                            "recommendations": []
-                        }
-                    }
-            except:
-                return {
-                    "status": "success",
-                    "data": {
-                        "analysis": result["data"]["choices"][0]["message"]["content"],
-                        "weaknesses": [],
-                        "recommendations": []
-                    }
-                }
-        
-        return result
+        return self._completion_with_json(
+            prompt,
+            lambda text: {"analysis": text, "weaknesses": [], "recommendations": []},
+            model=self.analysis_model,
+            temperature=0.3
+        )
     
     def generate_improvement_plan(self, analysis_data):
         """Generate detailed improvement plan based on analysis"""
@@ -221,7 +673,7 @@ class LLMAPIClient:
         Based on the following analysis, create a detailed improvement plan:
         
         Analysis:
-        {json.dumps(analysis_data, indent=2)}
+        {_compact_dumps(analysis_data)}
         
         Create a comprehensive improvement plan with:
         1. Specific actionable steps
@@ -247,34 +699,18 @@ class LLMAPIClient:
         }}
         """
         
-        result = self.simple_completion(prompt, temperature=0.3)
-        
-        if result["status"] == "success":
-            try:
-                response_text = result["data"]["choices"][0]["message"]["content"]
-                import re
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    plan = json.loads(json_match.group())
-                    return {
-                        "status": "success",
-                        "data": plan
-                    }
-            except:
-                pass
-            
-            return {
-                "status": "success",
-                "data": {
-                    "plan_name": "Generated Improvement Plan",
-                    "steps": [],
-                    "risks": [],
-                    "expected_outcomes": [],
-                    "raw_response": result["data"]["choices"][0]["message"]["content"]
-                }
-            }
-        
-        return result
+        return self._completion_with_json(
+            prompt,
+            lambda text: {
+                "plan_name": "Generated Improvement Plan",
+                "steps": [],
+                "risks": [],
+                "expected_outcomes": [],
+                "raw_response": text
+            },
+            model=self.analysis_model,
+            temperature=0.3
+        )
     
     def generate_service_code(self, service_type, requirements):
         """Generate code for new services based on requirements"""
@@ -282,7 +718,7 @@ class LLMAPIClient:
         Generate Python code for a {service_type} service with the following requirements:
         
         Requirements:
-        {json.dumps(requirements, indent=2)}
+        {_fast_dumps(requirements)}
         
         The code should:
         1. Be production-ready and well-documented
@@ -314,7 +750,7 @@ class LLMAPIClient:
         Analyze and optimize the following Flowise configuration:
         
         Current Configuration:
-        {json.dumps(current_config, indent=2)}
+        {_fast_dumps(current_config)}
         
         Provide optimization suggestions for:
         1. Node connections and flow efficiency
@@ -325,29 +761,115 @@ class LLMAPIClient:
         Return optimized configuration as JSON.
         """
         
-        result = self.simple_completion(prompt, temperature=0.3, max_tokens=1500)
+        return self._completion_with_json(
+            prompt,
+            lambda text: {"optimized_config": current_config, "suggestions": text},
+            temperature=0.3,
+            max_tokens=1500
+        )
+
+
+class AsyncLLMAPIClient:
+    """Async facade over LLMAPIClient so several prompts can be awaited together
+
+    Each call runs the blocking client method in a worker thread; with
+    asyncio.gather the prompts overlap on the pooled session instead of
+    running back to back.
+    """
+    
+    def __init__(self, base_url="http://localhost:8000", api_key=None, client=None, max_concurrency=4):
+        # A client passed in belongs to the caller and is not closed by aclose
+        self._owns_client = client is None
+        self._client = client or LLMAPIClient(base_url, api_key)
+        # Caps the requests in flight so a large batch does not overload the LLM server
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._semaphore_loop = None
+    
+    def _limiter(self):
+        # asyncio primitives belong to one event loop; create one per loop in use
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _call(self, method, *args, **kwargs):
+        async with self._limiter():
+            return await asyncio.to_thread(method, *args, **kwargs)
+    
+    async def test_connection(self):
+        return await self._call(self._client.test_connection)
+    
+    async def get_models(self):
+        return await self._call(self._client.get_models)
+    
+    async def chat_completion(self, messages, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000, on_chunk=None):
+        return await self._call(self._client.chat_completion, messages, model, temperature, max_tokens, on_chunk)
+    
+    async def simple_completion(self, prompt, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000, on_chunk=None):
+        return await self._call(self._client.simple_completion, prompt, model, temperature, max_tokens, on_chunk)
+    
+    async def analyze_system_performance(self, performance_data):
+        return await self._call(self._client.analyze_system_performance, performance_data)
+    
+    async def generate_improvement_plan(self, analysis_data):
+        return await self._call(self._client.generate_improvement_plan, analysis_data)
+    
+    async def generate_service_code(self, service_type, requirements):
+        return await self._call(self._client.generate_service_code, service_type, requirements)
+    
+    async def optimize_flowise_configuration(self, current_config):
+        return await self._call(self._client.optimize_flowise_configuration, current_config)
+    
+    async def gather_completions(self, prompts, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000):
+        """Run simple completions for several prompts concurrently, results in prompt order"""
+        outcomes = await asyncio.gather(
+            *(self.simple_completion(prompt, model, temperature, max_tokens) for prompt in prompts),
+            return_exceptions=True
+        )
+        return [self._as_result(outcome) for outcome in outcomes]
+    
+    @staticmethod
+    def _as_result(outcome):
+        if isinstance(outcome, Exception):
+            return {
+                "status": "error",
+                "message": f"Request failed: {str(outcome)}"
+            }
+        return outcome
+    
+    async def analyze_and_plan(self, performance_data, service_type=None, requirements=None):
+        """
+        Analyse performance data and derive an improvement plan; service code
+        generation (if requested) does not depend on either and runs alongside
+        """
+        calls = [self.analyze_system_performance(performance_data)]
+        if service_type is not None:
+            calls.append(self.generate_service_code(service_type, requirements or {}))
+        outcomes = await asyncio.gather(*calls, return_exceptions=True)
         
-        if result["status"] == "success":
+        analysis = self._as_result(outcomes[0])
+        if analysis["status"] == "success":
             try:
-                response_text = result["data"]["choices"][0]["message"]["content"]
-                import re
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    optimized_config = json.loads(json_match.group())
-                    return {
-                        "status": "success",
-                        "data": optimized_config
-                    }
-            except:
-                pass
-            
-            return {
-                "status": "success",
-                "data": {
-                    "optimized_config": current_config,
-                    "suggestions": result["data"]["choices"][0]["message"]["content"]
-                }
+                plan = await self.generate_improvement_plan(analysis["data"])
+            except Exception as e:
+                plan = self._as_result(e)
+        else:
+            plan = {
+                "status": "error",
+                "message": "Analysis failed, no plan generated"
             }
         
+        result = {
+            "analysis": analysis,
+            "plan": plan
+        }
+        if service_type is not None:
+            result["service_code"] = self._as_result(outcomes[1])
         return result
-
+    
+    async def aclose(self):
+        """Close the client this facade created (see LLMAPIClient.close)"""
+        if self._owns_client:
+            self._client.close()
@@ -0,0 +1,248 @@
+# llm_cache.py
+import json
+import zlib
+import sqlite3
+import hashlib
+import threading
+import time
+import orjson
+from collections import OrderedDict
+from concurrent.futures import Future
+from .llm_api_client import LLMAPIClient
+
+# Fields that change on every call without changing the meaning of the input
+VOLATILE_KEYS = frozenset({"timestamp"})
+
+
+def canonicalize(value, precision=2):
+    """Normalize an LLM input so near-identical snapshots map to the same key"""
+    if isinstance(value, dict):
+        return {
+            key: canonicalize(item, precision)
+            for key, item in value.items()
+            if key not in VOLATILE_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item, precision) for item in value]
+    if isinstance(value, float):
+        return round(value, precision)
+    return value
+
+
+def cache_key(payload):
+    """SHA-256 over the canonical JSON form of a request payload"""
+    canonical = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class LLMCache:
+    """In-memory TTL + LRU cache for LLM responses"""
+
+    def __init__(self, ttl_seconds=3600, max_entries=512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value or None if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteLLMCache:
+    """Persistent TTL cache for raw LLM responses, zlib-compressed JSON in SQLite"""
+
+    def __init__(self, path="llm_response_cache.sqlite3", ttl_seconds=7 * 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0}
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # Opened lazily so importing the module never creates the database file
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value BLOB, created_at INTEGER)"
+            )
+        return self._conn
+
+    def get(self, key):
+        """Return the cached value or None if missing or expired"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM responses WHERE key = ? AND created_at > ?",
+                (key, int(time.time() - self.ttl_seconds))
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+        return orjson.loads(zlib.decompress(row[0]))
+
+    def set(self, key, value):
+        """Store a value and drop expired rows"""
+        blob = zlib.compress(orjson.dumps(value, default=str))
+        now = int(time.time())
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, blob, now)
+                )
+                conn.execute(
+                    "DELETE FROM responses WHERE created_at <= ?",
+                    (now - self.ttl_seconds,)
+                )
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM responses")
+
+
+class CachingLLMClient(LLMAPIClient):
+    """LLMAPIClient that answers repeated analyses and plans from an LLMCache
+
+    With a response_cache (e.g. SQLiteLLMCache) raw chat completions are cached
+    as well, keyed on endpoint, API key, model, messages and sampling parameters.
+    """
+
+    # Above this temperature answers are meant to vary, so they are not cached
+    MAX_CACHED_TEMPERATURE = 0.5
+
+    # Seconds a successful model list is reused
+    MODELS_TTL = 30
+
+    def __init__(self, *args, cache=None, response_cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache if cache is not None else LLMCache()
+        self.response_cache = response_cache
+        # (monotonic time, (base_url, api_key), result) of the last successful get_models
+        self._models = None
+        # cache key -> Future of the LLM call currently computing it
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def get_models(self):
+        """Model list, reused for MODELS_TTL seconds as long as endpoint and API key are unchanged"""
+        now = time.monotonic()
+        owner = (self.base_url, self.api_key)
+        cached = self._models
+        if cached is not None and cached[1] == owner and now - cached[0] < self.MODELS_TTL:
+            return cached[2]
+        result = super().get_models()
+        if result.get("status") == "success":
+            self._models = (now, owner, result)
+        return result
+
+    def chat_completion(self, messages, model="gpt-3.5-turbo", temperature=0.7, max_tokens=1000,
+                        on_chunk=None, response_format=None, no_cache=False):
+        call = super().chat_completion
+        # Streamed calls want their chunks live, so they bypass the cache
+        if (no_cache or on_chunk is not None or self.response_cache is None
+                or temperature > self.MAX_CACHED_TEMPERATURE):
+            return call(messages, model, temperature, max_tokens, on_chunk, response_format)
+
+        # Keyed on the API key as well, so a key without access to a model never
+        # gets answers fetched with another one; only the digest is stored
+        key = cache_key({
+            "base_url": self.base_url,
+            "api_key": self.api_key,
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": response_format
+        })
+        result = self.response_cache.get(key)
+        if result is not None:
+            return result
+
+        result = call(messages, model, temperature, max_tokens, response_format=response_format)
+        if result.get("status") == "success":
+            self.response_cache.set(key, result)
+        return result
+
+    def analyze_system_performance(self, performance_data):
+        return self._cached(
+            "analyze_system_performance",
+            performance_data,
+            super().analyze_system_performance
+        )
+
+    def generate_improvement_plan(self, analysis_data):
+        return self._cached(
+            "generate_improvement_plan",
+            analysis_data,
+            super().generate_improvement_plan
+        )
+
+    def _cached(self, operation, data, call):
+        """Serve a successful result from the cache or compute and store it"""
+        key = cache_key({
+            "operation": operation,
+            "base_url": self.base_url,
+            "model": self.analysis_model,
+            "input": canonicalize(data)
+        })
+
+        result = self.cache.get(key)
+        if result is not None:
+            self.logger.info(f"LLM cache hit for {operation} (stats: {self.cache.stats})")
+            return result
+
+        # Concurrent misses for the same key share one LLM call instead of each
+        # paying the full latency
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.logger.info(f"LLM call for {operation} already in flight, waiting for it")
+            return future.result()
+
+        self.logger.info(f"LLM cache miss for {operation} (stats: {self.cache.stats})")
+        try:
+            result = call(data)
+            if result.get("status") == "success":
+                self.cache.set(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
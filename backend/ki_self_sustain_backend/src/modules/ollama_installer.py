@@ -1,11 +1,38 @@
 import subprocess
 import requests
-import json
+import orjson
 import time
 import logging
 import os
 import platform
+import shutil
+import threading
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import psutil
+except ImportError:  # optional, only used for the memory/disk requirement check
+    psutil = None
+
+# Models tried in order when no working model is installed yet
+DEFAULT_MODELS = ("llama3.2", "llama3", "phi3", "gemma2")
+
+# Free disk space needed before two models are downloaded at the same time (~4-8 GB each)
+PARALLEL_PULL_MIN_FREE_GB = 16
+
+# User creation and service activation for create_systemd_service
+SYSTEMD_SETUP_SCRIPT = (
+    "id -u ollama >/dev/null 2>&1 || useradd -r -s /bin/false -m -d /usr/share/ollama ollama; "
+    "systemctl daemon-reload && systemctl enable --now ollama"
+)
+
+def _iter_json_lines(response):
+    """Parsed objects of a streamed NDJSON response, lines kept as bytes until orjson parses them"""
+    for line in response.iter_lines():
+        if line:
+            yield orjson.loads(line)
 
 class OllamaInstaller:
     """Automatic Ollama installation and model setup"""
@@ -13,21 +40,52 @@ class OllamaInstaller:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.ollama_url = "http://localhost:11434"
+        # One keep-alive pool for the readiness polls, model tests and pulls
+        # (two pulls may run at once, see _parallel_pulls)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.system = platform.system().lower()
+        # (monotonic time, result) of the last check_ollama_installed call
+        self._last_check = None
         
-    def check_ollama_installed(self):
-        """Check if Ollama is installed and running"""
+    def _ollama_binary_present(self):
+        """Check if the ollama command exists (PATH scan, no subprocess)"""
+        return shutil.which('ollama') is not None
+    
+    def _running_models(self, timeout=5):
+        """Model names from /api/tags, or None if the Ollama service is not reachable"""
         try:
-            # Check if ollama command exists
-            result = subprocess.run(['which', 'ollama'], capture_output=True, text=True)
-            if result.returncode != 0:
-                return False
-                
-            # Check if Ollama service is running
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+            response = self.session.get(f"{self.ollama_url}/api/tags", timeout=timeout)
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            return [model['name'] for model in data.get('models', [])]
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
+            return None
+    
+    def check_ollama_installed(self, max_age=10):
+        """Check if Ollama is installed and running (reusing a result up to max_age seconds old)"""
+        now = time.monotonic()
+        if self._last_check is not None and now - self._last_check[0] < max_age:
+            return self._last_check[1]
+        result = self._ollama_binary_present() and self._running_models() is not None
+        self._last_check = (now, result)
+        return result
+    
+    def _wait_ready(self, timeout=30.0, interval=0.25):
+        """Poll /api/tags until the Ollama service answers or timeout seconds have passed"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if self.session.get(f"{self.ollama_url}/api/tags", timeout=1).status_code == 200:
+                    return True
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(interval)
+        self.logger.warning(f"Ollama service not ready after {timeout}s")
+        return False
     
     def install_ollama(self):
         """Install Ollama on the system"""
@@ -45,14 +103,14 @@ class OllamaInstaller:
                     
                 # Start Ollama service
                 subprocess.Popen(['ollama', 'serve'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                time.sleep(10)  # Wait for service to start
+                self._wait_ready()  # Wait for service to start
                 
             elif self.system == "darwin":  # macOS
                 # For macOS, we'll try to install via Homebrew
                 try:
                     subprocess.run(['brew', 'install', 'ollama'], check=True)
                     subprocess.Popen(['ollama', 'serve'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    time.sleep(10)
+                    self._wait_ready()
                 except subprocess.CalledProcessError:
                     self.logger.error("Failed to install Ollama via Homebrew")
                     return False
@@ -62,29 +120,47 @@ class OllamaInstaller:
                 return False
                 
             # Verify installation
-            return self.check_ollama_installed()
+            return self.check_ollama_installed(max_age=0)
             
         except Exception as e:
             self.logger.error(f"Ollama installation failed: {str(e)}")
             return False
     
-    def pull_model(self, model_name="llama3.2"):
-        """Pull a specific model"""
+    def pull_model(self, model_name="llama3.2", on_progress=None, cancel=None):
+        """Pull a specific model; on_progress(event) receives each progress event of the download,
+        and setting the cancel event stops the download at its next progress event"""
         try:
             self.logger.info(f"Pulling model: {model_name}")
             
-            # Use ollama pull command
-            result = subprocess.run(['ollama', 'pull', model_name], 
-                                  capture_output=True, text=True, timeout=600)
+            # Streaming pull API of the running service instead of the ollama CLI
+            with self.session.post(
+                f"{self.ollama_url}/api/pull",
+                json={"name": model_name, "stream": True},
+                stream=True,
+                timeout=(10, 600)
+            ) as response:
+                if response.status_code != 200:
+                    self.logger.error(f"Failed to pull model {model_name}: HTTP {response.status_code}")
+                    return False
+                
+                for event in _iter_json_lines(response):
+                    if cancel is not None and cancel.is_set():
+                        # Leaving the with block closes the stream, which ends the pull
+                        self.logger.info(f"Pull of model {model_name} cancelled")
+                        return False
+                    if on_progress:
+                        on_progress(event)
+                    if "error" in event:
+                        self.logger.error(f"Failed to pull model {model_name}: {event['error']}")
+                        return False
+                    if event.get("status") == "success":
+                        self.logger.info(f"Successfully pulled model: {model_name}")
+                        return True
             
-            if result.returncode == 0:
-                self.logger.info(f"Successfully pulled model: {model_name}")
-                return True
-            else:
-                self.logger.error(f"Failed to pull model {model_name}: {result.stderr}")
-                return False
+            self.logger.error(f"Pull of model {model_name} ended without success")
+            return False
                 
-        except subprocess.TimeoutExpired:
+        except requests.exceptions.Timeout:
             self.logger.error(f"Timeout while pulling model: {model_name}")
             return False
         except Exception as e:
@@ -93,14 +169,7 @@ class OllamaInstaller:
     
     def get_available_models(self):
         """Get list of available models"""
-        try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                return [model['name'] for model in data.get('models', [])]
-            return []
-        except:
-            return []
+        return self._running_models(timeout=10) or []
     
     def test_model(self, model_name="llama3.2"):
         """Test if a model is working"""
@@ -108,15 +177,21 @@ class OllamaInstaller:
             test_payload = {
                 "model": model_name,
                 "prompt": "Hello, how are you?",
-                "stream": False
+                "stream": True
             }
             
-            response = requests.post(f"{self.ollama_url}/api/generate", 
-                                   json=test_payload, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return 'response' in data and len(data['response']) > 0
+            # Streamed, so the first generated token already proves the model works
+            with self.session.post(f"{self.ollama_url}/api/generate",
+                                   json=test_payload, stream=True, timeout=30) as response:
+                if response.status_code != 200:
+                    return False
+                for event in _iter_json_lines(response):
+                    if "error" in event:
+                        return False
+                    if event.get("response"):
+                        return True
+                    if event.get("done"):
+                        break
             return False
             
         except Exception as e:
@@ -128,12 +203,13 @@ class OllamaInstaller:
         try:
             self.logger.info("Starting complete Ollama setup...")
             
-            # Step 1: Check if already installed
-            if self.check_ollama_installed():
+            # Step 1: Check if already installed; the /api/tags answer that proves
+            # the service is running also carries the installed models
+            models = self._running_models() if self._ollama_binary_present() else None
+            if models is not None:
                 self.logger.info("Ollama is already installed and running")
                 
                 # Check if we have any models
-                models = self.get_available_models()
                 if models:
                     self.logger.info(f"Found existing models: {models}")
                     # Test the first available model
@@ -155,26 +231,23 @@ class OllamaInstaller:
                         "message": "Failed to install Ollama"
                     }
                 
-                # Wait a bit more for service to be ready
-                time.sleep(5)
+                # Make sure the service answers before pulling models
+                self._wait_ready()
             
-            # Step 3: Pull default model
-            default_models = ["llama3.2", "llama3", "phi3", "gemma2"]
-            model_installed = False
+            # Step 3: Pull default model (skipping the download for ones already present)
+            present = frozenset(
+                name[:-len(":latest")] if name.endswith(":latest") else name
+                for name in models or ()
+            )
+            installed_model = None
+            workers = self._parallel_pulls()
             
-            for model in default_models:
-                self.logger.info(f"Attempting to install model: {model}")
-                if self.pull_model(model):
-                    if self.test_model(model):
-                        model_installed = True
-                        installed_model = model
-                        break
-                    else:
-                        self.logger.warning(f"Model {model} pulled but not working properly")
-                else:
-                    self.logger.warning(f"Failed to pull model: {model}")
+            for i in range(0, len(DEFAULT_MODELS), workers):
+                installed_model = self._first_working_model(DEFAULT_MODELS[i:i + workers], present)
+                if installed_model:
+                    break
             
-            if not model_installed:
+            if not installed_model:
                 return {
                     "status": "error",
                     "message": "Failed to install any working model"
@@ -198,11 +271,63 @@ class OllamaInstaller:
                 "message": f"Setup failed: {str(e)}"
             }
     
+    def _try_model(self, model, present, cancel=None):
+        """Pull (unless already present) and test a model; returns its name or None"""
+        self.logger.info(f"Attempting to install model: {model}")
+        pulled = model in present or self.pull_model(model, cancel=cancel)
+        if cancel is not None and cancel.is_set():
+            # Another candidate already won
+            return None
+        if not pulled:
+            self.logger.warning(f"Failed to pull model: {model}")
+            return None
+        if not self.test_model(model):
+            self.logger.warning(f"Model {model} pulled but not working properly")
+            return None
+        return model
+    
+    def _parallel_pulls(self):
+        """Two concurrent pulls if the disk can take both models, otherwise one"""
+        try:
+            free_gb = shutil.disk_usage('/').free / (1024**3)
+        except OSError:
+            return 1
+        return 2 if free_gb >= PARALLEL_PULL_MIN_FREE_GB else 1
+    
+    def _first_working_model(self, candidates, present):
+        """Try candidates concurrently and return the first one that pulls and passes the test"""
+        if len(candidates) == 1:
+            return self._try_model(candidates[0], present)
+        
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        cancel = threading.Event()
+        try:
+            futures = [executor.submit(self._try_model, model, present, cancel) for model in candidates]
+            for future in as_completed(futures):
+                model = future.result()
+                if model:
+                    return model
+            return None
+        finally:
+            # The slower candidate's pull stops at its next progress event instead of
+            # downloading a model that is no longer needed
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def check_system_requirements(self):
         """Check if system meets requirements for Ollama"""
+        if psutil is None:
+            # psutil not available, assume requirements are met
+            return {
+                "memory_available_gb": "unknown",
+                "disk_free_gb": "unknown", 
+                "memory_sufficient": True,
+                "disk_sufficient": True,
+                "system": self.system,
+                "meets_requirements": True
+            }
+        
         try:
-            import psutil
-            
             # Check available memory (Ollama needs at least 2GB for testing)
             memory = psutil.virtual_memory()
             available_gb = memory.available / (1024**3)
@@ -222,16 +347,6 @@ class OllamaInstaller:
             
             return requirements
             
-        except ImportError:
-            # psutil not available, assume requirements are met
-            return {
-                "memory_available_gb": "unknown",
-                "disk_free_gb": "unknown", 
-                "memory_sufficient": True,
-                "disk_sufficient": True,
-                "system": self.system,
-                "meets_requirements": True
-            }
         except Exception as e:
             self.logger.error(f"Failed to check system requirements: {str(e)}")
             return {
@@ -267,14 +382,12 @@ WantedBy=default.target
             with open(service_path, 'w') as f:
                 f.write(service_content)
             
-            # Create ollama user
-            subprocess.run(['useradd', '-r', '-s', '/bin/false', '-m', '-d', '/usr/share/ollama', 'ollama'], 
-                         capture_output=True)
-            
-            # Enable and start service
-            subprocess.run(['systemctl', 'daemon-reload'], check=True)
-            subprocess.run(['systemctl', 'enable', 'ollama'], check=True)
-            subprocess.run(['systemctl', 'start', 'ollama'], check=True)
+            # Create ollama user (unless present), then enable and start the service,
+            # all in one shell instead of a process per step
+            result = subprocess.run(['bash', '-c', SYSTEMD_SETUP_SCRIPT], capture_output=True, text=True)
+            if result.returncode != 0:
+                self.logger.error(f"Failed to enable Ollama service: {(result.stderr or result.stdout).strip()}")
+                return False
             
             return True
             
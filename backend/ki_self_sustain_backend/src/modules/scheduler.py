@@ -0,0 +1,78 @@
+# scheduler.py
+import sched
+import time
+import logging
+import threading
+
+
+class PeriodicTask:
+    """Handle für eine wiederkehrende Aufgabe im BackgroundScheduler"""
+
+    def __init__(self, name, interval, func, retry_interval=None):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.retry_interval = retry_interval if retry_interval is not None else interval
+        self.active = True
+
+    def cancel(self):
+        """Stoppt die Aufgabe nach dem aktuellen Lauf"""
+        self.active = False
+
+
+class BackgroundScheduler:
+    """
+    Ein gemeinsamer Scheduler-Thread für alle periodischen Hintergrundaufgaben
+    (Ethik-Überwachung, Metriken, Backups) statt eines Threads pro Aufgabe
+    """
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._scheduler = sched.scheduler(time.monotonic, self._delay)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def schedule_periodic(self, name, interval, func, retry_interval=None, initial_delay=0):
+        """Plant func alle interval Sekunden ein (retry_interval nach einem Fehler)"""
+        task = PeriodicTask(name, interval, func, retry_interval)
+        self._scheduler.enter(initial_delay, 0, self._run_task, (task,))
+        self._ensure_running()
+        return task
+
+    def _run_task(self, task):
+        if not task.active:
+            return
+        try:
+            task.func()
+            delay = task.interval
+        except Exception as e:
+            self.logger.error(f"Periodic task {task.name} failed: {e}")
+            delay = task.retry_interval
+        if task.active:
+            self._scheduler.enter(delay, 0, self._run_task, (task,))
+
+    def _delay(self, timeout):
+        # Wartet bis zum nächsten Termin oder bis eine neue Aufgabe eingeplant wird
+        if self._wakeup.wait(timeout):
+            self._wakeup.clear()
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="background-scheduler", daemon=True
+                )
+                self._thread.start()
+            else:
+                self._wakeup.set()
+
+    def _loop(self):
+        while True:
+            self._scheduler.run()
+            # Warteschlange leer: schlafen bis zur nächsten Einplanung
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+
+background_scheduler = BackgroundScheduler()
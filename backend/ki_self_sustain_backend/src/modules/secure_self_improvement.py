@@ -1,6 +1,7 @@
 # secure_self_improvement.py
 import json
 import os
+import re
 import subprocess
 import logging
 from datetime import datetime
@@ -81,6 +82,13 @@ class SecureSelfImprovement:
 class SafetyChecks:
     """SicherheitsprÃ¼fungen fÃ¼r KI-Ãnderungen"""
     
+    # Alle gefährlichen Muster in einem Durchlauf über den Code
+    _DANGEROUS_PATTERNS_RE = re.compile("|".join(map(re.escape, (
+        "os.system(", "subprocess.", "eval(", "exec(",
+        "import os", "import sys", "__import__",
+        "open(", "write(", "delete", "remove"
+    ))))
+    
     def __init__(self):
         self.max_execution_time = 300  # Sekunden
         self.max_memory_usage = 1024 * 1024 * 100  # 100MB
@@ -88,15 +96,9 @@ class SafetyChecks:
     
     def validate_code_safety(self, code_snippet):
         """PrÃ¼ft Code auf gefÃ¤hrliche Operationen"""
-        dangerous_patterns = [
-            "os.system(", "subprocess.", "eval(", "exec(",
-            "import os", "import sys", "__import__",
-            "open(", "write(", "delete", "remove"
-        ]
-        
-        for pattern in dangerous_patterns:
-            if pattern in code_snippet:
-                return False, f"Dangerous pattern detected: {pattern}"
+        match = self._DANGEROUS_PATTERNS_RE.search(code_snippet)
+        if match:
+            return False, f"Dangerous pattern detected: {match.group()}"
         
         return True, "Safe"
     
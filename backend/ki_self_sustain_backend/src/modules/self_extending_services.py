@@ -4,6 +4,37 @@ import subprocess
 import json
 from datetime import datetime
 
+# Vorlage der festen Knoten und Verbindungen jeder generierten Map; die Dicts sind
+# veränderlich, daher bekommt jede Map eigene Kopien (siehe generate_map_structure)
+_MAP_NODES = (
+    {
+        "id": "input_1",
+        "type": "input",
+        "label": "User Input"
+    },
+    {
+        "id": "llm_1",
+        "type": "llm",
+        "label": "AI Processing",
+        "model": "llama3"
+    },
+    {
+        "id": "output_1",
+        "type": "output",
+        "label": "Result"
+    }
+)
+_MAP_CONNECTIONS = (
+    {
+        "from": "input_1",
+        "to": "llm_1"
+    },
+    {
+        "from": "llm_1",
+        "to": "output_1"
+    }
+)
+
 class SelfExtendingService:
     def __init__(self):
         self.services_directory = "./services"
@@ -84,61 +115,66 @@ class SelfExtendingService:
     
     def generate_map_structure(self, purpose):
         """Generiert Flowise-Map-Struktur"""
-        # KI erstellt optimale Knoten-Konfiguration
+        # KI erstellt optimale Knoten-Konfiguration; nur der Name hängt vom Zweck ab
         return {
             "name": f"Auto-{purpose.replace(' ', '_')}_Flow",
-            "nodes": [
-                {
-                    "id": "input_1",
-                    "type": "input",
-                    "label": "User Input"
-                },
-                {
-                    "id": "llm_1",
-                    "type": "llm",
-                    "label": "AI Processing",
-                    "model": "llama3"
-                },
-                {
-                    "id": "output_1",
-                    "type": "output",
-                    "label": "Result"
-                }
-            ],
-            "connections": [
-                {
-                    "from": "input_1",
-                    "to": "llm_1"
-                },
-                {
-                    "from": "llm_1",
-                    "to": "output_1"
-                }
-            ]
+            "nodes": [dict(node) for node in _MAP_NODES],
+            "connections": [dict(connection) for connection in _MAP_CONNECTIONS]
         }
 
 # Beispiel fÃ¼r Virus-Scanner-Service
 def create_virus_scanner_template():
     return """
 import os
+import json
+import mmap
 import hashlib
+import sqlite3
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 class VirusScanner:
-    def __init__(self):
+    def __init__(self, cache_path="scan_cache.db"):
         self.known_malware_hashes = set()  # In realer Anwendung: Datenbank
         self.scan_queue = []
         self.is_scanning = False
+        # Hash je (Gerät, Inode) mit mtime und Größe; unveränderte Dateien werden nicht neu gehasht
+        self.cache_lock = threading.Lock()
+        self.cache = sqlite3.connect(cache_path, check_same_thread=False)
+        self.cache.execute("PRAGMA journal_mode=WAL")
+        self.cache.execute("PRAGMA synchronous=NORMAL")
+        self.cache.execute(
+            "CREATE TABLE IF NOT EXISTS file_hashes ("
+            "dev INTEGER, ino INTEGER, mtime INTEGER, size INTEGER, hash TEXT, "
+            "PRIMARY KEY (dev, ino))"
+        )
+    
+    def cached_file_hash(self, filepath):
+        '''SHA256-Hash aus dem Cache, solange mtime und Größe unverändert sind'''
+        st = os.stat(filepath)
+        with self.cache_lock:
+            row = self.cache.execute(
+                "SELECT hash FROM file_hashes WHERE dev = ? AND ino = ? AND mtime = ? AND size = ?",
+                (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+            ).fetchone()
+        if row:
+            return row[0]
+        
+        file_hash = self.calculate_file_hash(filepath)
+        with self.cache_lock, self.cache:
+            self.cache.execute(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size, file_hash)
+            )
+        return file_hash
     
     def scan_file(self, filepath):
         '''Scanne eine Datei auf Viren'''
         try:
-            if not os.path.exists(filepath):
-                return {"error": "File not found"}
-            
-            # Berechne Hash
-            file_hash = self.calculate_file_hash(filepath)
+            # Berechne Hash (unveränderte Dateien aus dem Cache); das stat dabei prüft auch die Existenz
+            file_hash = self.cached_file_hash(filepath)
             
             # Vergleiche mit bekannten Malware-Hashes
             if file_hash in self.known_malware_hashes:
@@ -155,26 +191,62 @@ class VirusScanner:
                 "hash": file_hash,
                 "timestamp": datetime.now().isoformat()
             }
+        except FileNotFoundError:
+            return {"error": "File not found"}
         except Exception as e:
             return {"error": str(e)}
     
     def calculate_file_hash(self, filepath):
-        '''Berechne SHA256-Hash einer Datei'''
+        '''Berechne SHA256-Hash einer Datei (ab 64 KiB per mmap, sonst hashlib.file_digest)'''
         sha256_hash = hashlib.sha256()
-        with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
+        with open(filepath, "rb", buffering=0) as f:
+            if os.fstat(f.fileno()).st_size >= 64 * 1024:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    sha256_hash.update(mm)
+            elif hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            else:
+                buf = bytearray(64 * 1024)
+                view = memoryview(buf)
+                while n := f.readinto(buf):
+                    sha256_hash.update(view[:n])
         return sha256_hash.hexdigest()
     
     def scan_directory(self, directory_path):
         '''Scanne ein Verzeichnis rekursiv'''
-        results = []
-        for root, dirs, files in os.walk(directory_path):
-            for file in files:
-                filepath = os.path.join(root, file)
-                result = self.scan_file(filepath)
-                results.append(result)
-        return results
+        return list(self.iter_scan_directory(directory_path))
+    
+    def iter_scan_directory(self, directory_path):
+        '''Liefert die Scan-Ergebnisse eines Verzeichnisses einzeln, in Dateireihenfolge
+        
+        Parallel (hashlib gibt beim Hashen den GIL frei), aber nur wenige Dateien
+        gleichzeitig in Arbeit, damit der Speicher nicht mit dem Baum wächst.
+        '''
+        workers = os.cpu_count() or 4
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for filepath in self._iter_files(directory_path):
+                pending.append(executor.submit(self.scan_file, filepath))
+                if len(pending) >= workers * 4:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _iter_files(self, directory_path):
+        '''Alle Dateipfade unterhalb eines Verzeichnisses (scandir, Dateityp aus dem Verzeichniseintrag)'''
+        stack = [directory_path]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        # Nur reguläre Dateien; Sockets und FIFOs würden beim Lesen blockieren
+                        yield entry.path
 
 # API-Endpunkte
 scanner = VirusScanner()
@@ -184,6 +256,11 @@ def scan_file_api(filepath):
 
 def scan_directory_api(directory_path):
     return scanner.scan_directory(directory_path)
+
+def scan_directory_stream_api(directory_path):
+    '''Scan-Ergebnisse als NDJSON-Zeilen (bytes), z.B. für eine gestreamte HTTP-Antwort'''
+    for result in scanner.iter_scan_directory(directory_path):
+        yield json.dumps(result).encode() + b"\\n"
 """
 
 # Flowise Integration
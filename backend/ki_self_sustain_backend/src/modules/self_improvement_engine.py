@@ -1,9 +1,71 @@
 # self_improvement_engine.py
 import json
+import queue
+import atexit
 import logging
+import logging.handlers
+import threading
 from datetime import datetime
 import os
 
+LOG_FILE = 'self_improvement.log'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Schwächen, die analyze_performance meldet und generate_improvement_plan auswertet
+WEAKNESS_ACCURACY = "Accuracy needs improvement"
+WEAKNESS_RESPONSE_TIME = "Response time too slow"
+
+_log_queue_handler = None
+_log_lock = threading.Lock()
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """FileHandler mit 64-KiB-Puffer, der nur alle flush_every Einträge, bei Warnungen und beim Schließen leert"""
+
+    def __init__(self, filename, flush_every=64):
+        self.flush_every = flush_every
+        self._unflushed = 0
+        self._force_flush = False
+        super().__init__(filename, encoding='utf-8', delay=True)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=65536, encoding=self.encoding)
+
+    def emit(self, record):
+        self._unflushed += 1
+        self._force_flush = record.levelno >= logging.WARNING
+        super().emit(record)
+
+    def flush(self):
+        # emit() ruft flush() nach jedem Eintrag auf; erst nach einem Schwung wirklich leeren
+        if self._force_flush or self._unflushed >= self.flush_every:
+            self._force_flush = False
+            self._unflushed = 0
+            super().flush()
+
+    def close(self):
+        self._force_flush = True
+        self.flush()
+        super().close()
+
+
+def _queue_handler():
+    """QueueHandler, dessen Einträge ein Hintergrund-Thread in Datei und Konsole schreibt (einmal pro Prozess)"""
+    global _log_queue_handler
+    with _log_lock:
+        if _log_queue_handler is None:
+            log_queue = queue.SimpleQueue()
+            formatter = logging.Formatter(LOG_FORMAT)
+            handlers = (_BufferedFileHandler(LOG_FILE), logging.StreamHandler())
+            for handler in handlers:
+                handler.setFormatter(formatter)
+            listener = logging.handlers.QueueListener(log_queue, *handlers)
+            listener.start()
+            # Beim Beenden noch ausstehende Einträge schreiben
+            atexit.register(listener.stop)
+            _log_queue_handler = logging.handlers.QueueHandler(log_queue)
+        return _log_queue_handler
+
 class SelfImprovementEngine:
     def __init__(self):
         self.performance_log = "performance_log.json"
@@ -11,15 +73,13 @@ class SelfImprovementEngine:
         self.setup_logging()
     
     def setup_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('self_improvement.log'),
-                logging.StreamHandler()
-            ]
-        )
+        # Schreiben übernimmt der Listener-Thread, der Aufrufer blockiert nicht auf Datei-I/O
         self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = _queue_handler()
+        if handler not in self.logger.handlers:
+            self.logger.addHandler(handler)
+        self.logger.propagate = False
     
     def analyze_performance(self, feedback_data):
         """Analysiere Leistungsdaten"""
@@ -32,10 +92,10 @@ class SelfImprovementEngine:
         
         # Logik zur Analyse
         if feedback_data.get("accuracy_score", 0) < 0.8:
-            analysis["weaknesses"].append("Accuracy needs improvement")
+            analysis["weaknesses"].append(WEAKNESS_ACCURACY)
             
         if feedback_data.get("response_time", 0) > 5:
-            analysis["weaknesses"].append("Response time too slow")
+            analysis["weaknesses"].append(WEAKNESS_RESPONSE_TIME)
             
         return analysis
     
@@ -47,12 +107,13 @@ class SelfImprovementEngine:
             "priorities": []
         }
         
-        # Dynamische Planung basierend auf Schwächen
-        if "Accuracy" in str(analysis.get("weaknesses", [])):
+        # Dynamische Planung basierend auf Schwächen (Mengenabgleich statt Suche im str() der Liste)
+        weaknesses = {w for w in analysis.get("weaknesses", ()) if isinstance(w, str)}
+        if WEAKNESS_ACCURACY in weaknesses:
             plan["actions"].append("Implement better validation logic")
             plan["priorities"].append("High")
             
-        if "Response time" in str(analysis.get("weaknesses", [])):
+        if WEAKNESS_RESPONSE_TIME in weaknesses:
             plan["actions"].append("Optimize processing algorithms")
             plan["priorities"].append("Medium")
             
@@ -0,0 +1,17 @@
+# time_utils.py
+import time
+from datetime import datetime
+
+# (monotonic Zeitpunkt, formatierter Zeitstempel) des letzten Aufrufs
+_last_now = (float("-inf"), "")
+
+
+def now_iso(max_age=0.001):
+    """Aktueller Zeitstempel als ISO-String, höchstens max_age Sekunden alt wiederverwendet"""
+    global _last_now
+    checked_at, formatted = _last_now
+    now = time.monotonic()
+    if now - checked_at >= max_age:
+        formatted = datetime.now().isoformat()
+        _last_now = (now, formatted)
+    return formatted
@@ -1,12 +1,85 @@
 # virus_detection_system.py
 import os
+import re
+import mmap
 import hashlib
 import requests
-from datetime import datetime
+from .time_utils import now_iso
+
+# Ab dieser Größe wird eine Datei gemappt statt gelesen
+MMAP_MIN_SIZE = 64 * 1024
+
+# Puffergröße beim Lesen kleiner Dateien vor Python 3.11 (ein wiederverwendeter Puffer, keine bytes pro Block)
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Bytes vom Dateianfang und -ende, die der Schnellscan hasht
+QUICK_SCAN_BYTES = 4096
+
+
+def _hash_file(filepath):
+    """SHA256-Hash einer Datei (große Dateien per mmap ohne Kopie, sonst hashlib.file_digest)"""
+    sha256_hash = hashlib.sha256()
+    with open(filepath, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                sha256_hash.update(mm)
+        elif hasattr(hashlib, "file_digest"):
+            # Liest bis EOF, also auch Dateien, deren Größe stat nicht kennt (z.B. /proc)
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        else:
+            buf = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buf)
+            while n := f.readinto(buf):
+                sha256_hash.update(view[:n])
+    return sha256_hash.hexdigest()
+
+
+def _hash_head_tail(filepath, length=QUICK_SCAN_BYTES):
+    """SHA256 über die ersten und letzten length Bytes einer Datei (kleine Dateien ganz)"""
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if size <= 2 * length:
+            data = os.read(fd, size)
+        else:
+            data = os.pread(fd, length, 0) + os.pread(fd, length, size - length)
+    finally:
+        os.close(fd)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _compile_content_patterns(patterns):
+    """Alle Byte-Signaturen als ein Regex (eine Gruppe je Signatur), None ohne Signaturen"""
+    if not patterns:
+        return None
+    return re.compile(b"|".join(b"(" + re.escape(p) + b")" for p in patterns.values()))
+
+
+def _search_file(filepath, pattern):
+    """Erster Treffer von pattern im Dateiinhalt, ein Durchlauf (große Dateien per mmap)"""
+    with open(filepath, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_MIN_SIZE:
+            return pattern.search(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return pattern.search(mm)
 
 class AdvancedVirusDetector:
     def __init__(self):
         self.signature_database = self.load_signature_database()
+        # Hash -> Signaturname: O(1)-Abgleich statt linearer Suche in values()
+        self.signature_index = {h: name for name, h in self.signature_database.items()}
+        # Hash von Anfang+Ende -> Signaturname für den Schnellscan
+        self.quick_signature_index = {
+            h: name for name, h in self.load_quick_signature_database().items()
+        }
+        # Byte-Signaturen für den Inhaltsscan, vorab zu einem Muster kompiliert
+        self.content_patterns = self.load_content_patterns()
+        self._content_names = list(self.content_patterns)
+        self._content_re = _compile_content_patterns(self.content_patterns)
         self.realtime_scanner = RealTimeScanner()
     
     def load_signature_database(self):
@@ -17,48 +90,75 @@ class AdvancedVirusDetector:
             "malware_sample_2": "hash0987654321fedcba"
         }
     
-    def scan_file_realtime(self, filepath):
-        """Echtzeit-Scan einer Datei"""
+    def load_quick_signature_database(self):
+        """Lädt Signaturen über Dateianfang und -ende (siehe _hash_head_tail)"""
+        # In realer Anwendung: Laden von Online-Datenbanken
+        return {}
+    
+    def load_content_patterns(self):
+        """Lädt Byte-Signaturen (Name -> bytes) für den heuristischen Inhaltsscan"""
+        # In realer Anwendung: Laden von Online-Datenbanken
+        return {}
+    
+    def scan_file_realtime(self, filepath, quick=False):
+        """Echtzeit-Scan einer Datei; quick prüft vorab Anfang und Ende (nur Vorfilter,
+        gemeldet wird ausschließlich ein Treffer des vollständigen Hashes)"""
         try:
-            # Hash berechnen
+            quick_match = None
+            if quick:
+                quick_match = self.quick_signature_index.get(_hash_head_tail(filepath))
+            
+            # Der vollständige Hash wird immer berechnet: ein Anfang/Ende-Treffer allein
+            # ist kein Beweis, und Malware ohne Schnellsignatur fände sonst niemand
             file_hash = self.calculate_file_hash(filepath)
             
             # Mit Signaturen vergleichen
-            if file_hash in self.signature_database.values():
+            signature = self.signature_index.get(file_hash)
+            if signature:
                 return {
                     "threat_detected": True,
                     "threat_type": "known_malware",
+                    "signature": signature,
                     "file": filepath,
                     "hash": file_hash,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now_iso()
                 }
             
             # Heuristik-Scan (KI-basiert)
             heuristic_result = self.heuristic_scan(filepath)
             
-            return {
+            result = {
                 "threat_detected": heuristic_result["malicious"],
                 "threat_type": heuristic_result["type"],
                 "file": filepath,
                 "hash": file_hash,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "confidence": heuristic_result["confidence"]
             }
+            if quick_match:
+                # Anfang/Ende passen zu einer Signatur, der vollständige Hash aber nicht
+                result["unconfirmed_quick_signature"] = quick_match
+            return result
         except Exception as e:
             return {"error": str(e)}
     
     def calculate_file_hash(self, filepath):
         """Berechne SHA256-Hash"""
-        sha256_hash = hashlib.sha256()
-        with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+        return _hash_file(filepath)
     
     def heuristic_scan(self, filepath):
         """Heuristischer Scan (KI-gestÃ¼tzt)"""
         # KI analysiert Datei-Struktur, Metadaten, etc.
         # Diese Funktion wÃ¼rde durch KI-Modelle erweitert werden
+        if self._content_re is not None:
+            match = _search_file(filepath, self._content_re)
+            if match:
+                return {
+                    "malicious": True,
+                    "type": "content_signature",
+                    "signature": self._content_names[match.lastindex - 1],
+                    "confidence": 0.9
+                }
         return {
             "malicious": False,
             "type": "unknown",
@@ -0,0 +1,104 @@
+# write_behind.py
+import os
+import queue
+import atexit
+import logging
+import threading
+
+APPEND = "append"
+REPLACE = "replace"
+
+
+class WriteBehindWriter:
+    """
+    Schreibt Dateien asynchron in einem Hintergrund-Thread.
+    Aufrufer serialisieren selbst und reichen nur fertige Bytes ein,
+    aufeinanderfolgende Appends auf dieselbe Datei werden zusammengefasst.
+    Die Warteschlange ist begrenzt: ist sie voll, wartet der Aufrufer, bis der
+    Writer aufgeholt hat, statt Daten zu verwerfen oder den Speicher zu füllen.
+    """
+
+    def __init__(self, max_batch=64, max_pending=1024):
+        self.max_batch = max_batch
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        atexit.register(self.flush)
+
+    def append(self, path, data):
+        """Hängt Bytes an eine Datei an"""
+        self._submit((APPEND, path, data))
+
+    def replace(self, path, data):
+        """Ersetzt eine Datei atomar durch die übergebenen Bytes"""
+        self._submit((REPLACE, path, data))
+
+    def flush(self):
+        """Blockiert, bis alle eingereihten Schreibvorgänge erledigt sind"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _submit(self, operation):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="write-behind", daemon=True
+                )
+                self._thread.start()
+        try:
+            self._queue.put_nowait(operation)
+        except queue.Full:
+            self.logger.warning("Write-behind queue full, waiting for the writer")
+            self._queue.put(operation)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        # Reihenfolge bleibt erhalten, nur direkt aufeinanderfolgende Appends werden gebündelt
+        pending_path = None
+        pending_chunks = []
+        for kind, path, data in batch:
+            if kind == APPEND and path == pending_path:
+                pending_chunks.append(data)
+                continue
+            self._flush_appends(pending_path, pending_chunks)
+            pending_path, pending_chunks = None, []
+            if kind == APPEND:
+                pending_path, pending_chunks = path, [data]
+            else:
+                self._replace(path, data)
+        self._flush_appends(pending_path, pending_chunks)
+
+    def _flush_appends(self, path, chunks):
+        if not chunks:
+            return
+        try:
+            with open(path, 'ab') as f:
+                f.write(b"".join(chunks))
+        except Exception as e:
+            self.logger.error(f"Failed to append to {path}: {e}")
+
+    def _replace(self, path, data):
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.error(f"Failed to write {path}: {e}")
+
+
+write_behind = WriteBehindWriter()
@@ -3,39 +3,66 @@ from flask_cors import cross_origin
 import json
 import os
 import yaml
-from datetime import datetime
-from src.modules.enhanced_ai_manager import EnhancedAIManager
-from src.modules.self_improvement_engine import SelfImprovementEngine
-from src.modules.flowise_optimizer import FlowiseOptimizer
-from src.modules.self_extending_services import SelfExtendingService
+try:
+    # libyaml C bindings, much faster than the pure Python loader/dumper
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+from functools import lru_cache
 from src.modules.ethics_monitoring import EthicsMonitoringSystem
+from src.modules.time_utils import now_iso
 from src.modules.immutable_ethics import ImmutableEthicsFramework
-from src.modules.immutable_ai_control import ImmutableAIController
-from src.modules.fallback_strategies import FallbackManager
 
 ai_control_bp = Blueprint('ai_control', __name__)
 
-# Initialize core components
+SECURITY_CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'security_config.yaml')
+
+# (mtime_ns, size, parsed config) of the last security_config.yaml read
+_security_config_cache = None
+
+def _load_security_config():
+    """Parsed security config, re-read only when the file's mtime or size changed"""
+    global _security_config_cache
+    st = os.stat(SECURITY_CONFIG_PATH)
+    cached = _security_config_cache
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    with open(SECURITY_CONFIG_PATH, 'r') as f:
+        config = yaml.load(f, Loader=YamlLoader)
+    _security_config_cache = (st.st_mtime_ns, st.st_size, config)
+    return config
+
+# Initialize core components; ethics monitoring has to run from startup
 try:
-    ai_manager = EnhancedAIManager()
-    improvement_engine = SelfImprovementEngine()
-    flowise_optimizer = FlowiseOptimizer()
-    extending_service = SelfExtendingService()
     ethics_monitor = EthicsMonitoringSystem()
     ethics_framework = ImmutableEthicsFramework()
-    ai_controller = ImmutableAIController()
-    fallback_manager = FallbackManager()
 except Exception as e:
     print(f"Warning: Failed to initialize some components: {e}")
     # Initialize with None to prevent crashes
-    ai_manager = None
-    improvement_engine = None
-    flowise_optimizer = None
-    extending_service = None
     ethics_monitor = None
     ethics_framework = None
-    ai_controller = None
-    fallback_manager = None
+
+# The remaining components are imported and built on first use, so a worker
+# only pays for the ones its requests actually need
+@lru_cache(maxsize=1)
+def get_improvement_engine():
+    from src.modules.self_improvement_engine import SelfImprovementEngine
+    return SelfImprovementEngine()
+
+@lru_cache(maxsize=1)
+def get_flowise_optimizer():
+    from src.modules.flowise_optimizer import FlowiseOptimizer
+    return FlowiseOptimizer()
+
+@lru_cache(maxsize=1)
+def get_extending_service():
+    from src.modules.self_extending_services import SelfExtendingService
+    return SelfExtendingService()
+
+@lru_cache(maxsize=1)
+def get_ai_controller():
+    from src.modules.immutable_ai_control import ImmutableAIController
+    return ImmutableAIController()
 
 @ai_control_bp.route('/status', methods=['GET'])
 @cross_origin()
@@ -43,7 +70,7 @@ def get_system_status():
     """Get overall system status"""
     try:
         status = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "system_health": "operational",
             "ethics_integrity": ethics_framework.verify_ethics_integrity(),
             "monitoring_status": ethics_monitor.get_monitoring_status(),
@@ -64,8 +91,8 @@ def get_system_status():
 def get_ethics_principles():
     """Get immutable ethics principles"""
     try:
-        principles = ethics_framework.get_ethics_principles()
-        safety_rules = ethics_framework.get_safety_rules()
+        principles = dict(ethics_framework.get_ethics_principles())
+        safety_rules = dict(ethics_framework.get_safety_rules())
         return jsonify({
             "principles": principles,
             "safety_rules": safety_rules,
@@ -80,10 +107,7 @@ def get_ethics_principles():
 def get_security_config():
     """Get security configuration"""
     try:
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'security_config.yaml')
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        return jsonify(config)
+        return jsonify(_load_security_config())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -92,8 +116,8 @@ def get_security_config():
 def update_security_config():
     """Update security configuration"""
     try:
+        global _security_config_cache
         new_config = request.json
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'security_config.yaml')
         
         # Validate configuration
         required_keys = ['security', 'fallback', 'safety']
@@ -101,8 +125,9 @@ def update_security_config():
             if key not in new_config:
                 return jsonify({"error": f"Missing required key: {key}"}), 400
         
-        with open(config_path, 'w') as f:
-            yaml.dump(new_config, f, default_flow_style=False)
+        with open(SECURITY_CONFIG_PATH, 'w') as f:
+            yaml.dump(new_config, f, Dumper=YamlDumper, default_flow_style=False)
+        _security_config_cache = None
         
         return jsonify({"message": "Security configuration updated successfully"})
     except Exception as e:
@@ -114,7 +139,7 @@ def analyze_performance():
     """Analyze system performance for improvement"""
     try:
         feedback_data = request.json
-        analysis = improvement_engine.analyze_performance(feedback_data)
+        analysis = get_improvement_engine().analyze_performance(feedback_data)
         return jsonify(analysis)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -125,7 +150,7 @@ def generate_improvement_plan():
     """Generate improvement plan based on analysis"""
     try:
         analysis_data = request.json
-        plan = improvement_engine.generate_improvement_plan(analysis_data)
+        plan = get_improvement_engine().generate_improvement_plan(analysis_data)
         return jsonify(plan)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -138,10 +163,10 @@ def execute_improvements():
         plan_data = request.json
         
         # Validate against immutable controls
-        ai_controller.validate_ai_action(plan_data)
+        get_ai_controller().validate_ai_action(plan_data)
         
-        results = improvement_engine.execute_improvements(plan_data)
-        evaluation = improvement_engine.evaluate_results(results)
+        results = get_improvement_engine().execute_improvements(plan_data)
+        evaluation = get_improvement_engine().evaluate_results(results)
         
         return jsonify({
             "results": results,
@@ -158,8 +183,8 @@ def optimize_flowise():
         flow_data = request.json
         flow_name = flow_data.get('flow_name', 'default_flow')
         
-        performance = flowise_optimizer.analyze_flow_performance(flow_name)
-        optimized = flowise_optimizer.optimize_flow(flow_name)
+        performance = get_flowise_optimizer().analyze_flow_performance(flow_name)
+        optimized = get_flowise_optimizer().optimize_flow(flow_name)
         
         return jsonify({
             "performance": performance,
@@ -173,7 +198,7 @@ def optimize_flowise():
 def analyze_system_needs():
     """Analyze current system needs"""
     try:
-        analysis = extending_service.analyze_system_needs()
+        analysis = get_extending_service().analyze_system_needs()
         return jsonify(analysis)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -187,9 +212,9 @@ def create_new_service():
         service_type = service_data.get('service_type', 'generic')
         
         # Validate against immutable controls
-        ai_controller.validate_ai_action(service_data)
+        get_ai_controller().validate_ai_action(service_data)
         
-        service_path = extending_service.create_new_service(service_type)
+        service_path = get_extending_service().create_new_service(service_type)
         
         return jsonify({
             "message": "Service created successfully",
@@ -207,7 +232,7 @@ def create_flowise_map():
         map_data = request.json
         purpose = map_data.get('purpose', 'general_purpose')
         
-        map_path = extending_service.create_flowise_map(purpose)
+        map_path = get_extending_service().create_flowise_map(purpose)
         
         return jsonify({
             "message": "Flowise map created successfully",
@@ -230,7 +255,7 @@ def communicate_with_llm():
         # For now, return a mock response
         response = {
             "llm_response": f"Mock LLM response to: {message}",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "endpoint": llm_endpoint
         }
         
@@ -246,13 +271,13 @@ def get_system_logs():
         # Mock log data - in real implementation, read from log files
         logs = [
             {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "level": "INFO",
                 "message": "System initialized successfully",
                 "component": "ai_manager"
             },
             {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "level": "INFO",
                 "message": "Ethics monitoring active",
                 "component": "ethics_monitor"
@@ -1,325 +1,318 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
+from werkzeug.exceptions import HTTPException
 from flask_cors import cross_origin
 import json
 import os
-from datetime import datetime
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from src.modules.time_utils import now_iso
 from src.modules.flowise_api_client import FlowiseAPIClient
-from src.modules.llm_api_client import LLMAPIClient
+from src.modules.llm_cache import CachingLLMClient, LLMCache
 
 flowise_control_bp = Blueprint('flowise_control', __name__)
 
-# Initialize clients with default endpoints
-flowise_client = FlowiseAPIClient()
-llm_client = LLMAPIClient()
+# Chatflows optimized at the same time by /auto-optimize
+AUTO_OPTIMIZE_WORKERS = 8
+
+# Seconds the polled chatflow list is served from memory (changes made through
+# this API invalidate it right away)
+CHATFLOWS_MAX_AGE = 30
+
+# Body limit for creating and updating chatflows, whose flowData can exceed the
+# app-wide MAX_CONTENT_LENGTH
+CHATFLOW_MAX_CONTENT_LENGTH = 16 << 20
+
+# Shape of a Flowise chatflow id (UUID); anything else is rejected before calling Flowise
+_CHATFLOW_ID_RE = re.compile(r'[0-9a-fA-F-]{8,64}')
+
+# Clients with default endpoints, built on first use so a forking server's
+# workers each open their own connection pools instead of inheriting sockets
+@lru_cache(maxsize=1)
+def get_flowise_client():
+    return FlowiseAPIClient()
+
+@lru_cache(maxsize=1)
+def get_llm_client():
+    # Near-identical analysis requests within a minute are answered from memory
+    return CachingLLMClient(cache=LLMCache(ttl_seconds=60, max_entries=128))
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=get_flowise_client.cache_clear)
+    os.register_at_fork(after_in_child=get_llm_client.cache_clear)
+
+@flowise_control_bp.errorhandler(Exception)
+def handle_route_error(e):
+    """Error envelope for exceptions raised by any route of this blueprint"""
+    if isinstance(e, HTTPException):
+        return jsonify({"error": str(e)}), e.code
+    return jsonify({"error": str(e)}), 500
+
+@flowise_control_bp.before_request
+def check_chatflow_id():
+    """Answer 400 for a malformed <chatflow_id> without a round trip to Flowise"""
+    chatflow_id = (request.view_args or {}).get('chatflow_id')
+    if chatflow_id is not None and not _CHATFLOW_ID_RE.fullmatch(chatflow_id):
+        return jsonify({"error": "Invalid chatflow id"}), 400
+
+@flowise_control_bp.before_app_request
+def allow_chatflow_bodies():
+    """Raise the body limit for the routes that receive whole chatflow definitions"""
+    if request.endpoint in ('flowise_control.create_chatflow', 'flowise_control.update_chatflow'):
+        request.max_content_length = CHATFLOW_MAX_CONTENT_LENGTH
 
 @flowise_control_bp.route('/config', methods=['GET'])
 @cross_origin()
 def get_flowise_config():
     """Get current Flowise configuration"""
-    try:
-        return jsonify({
-            "flowise_endpoint": flowise_client.base_url,
-            "llm_endpoint": llm_client.base_url,
-            "status": "active"
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return jsonify({
+        "flowise_endpoint": get_flowise_client().base_url,
+        "llm_endpoint": get_llm_client().base_url,
+        "status": "active"
+    })
 
 @flowise_control_bp.route('/config', methods=['POST'])
 @cross_origin()
 def update_flowise_config():
     """Update Flowise and LLM endpoints"""
-    try:
-        config = request.json
-        
-        if 'flowise_endpoint' in config:
-            flowise_client.set_base_url(config['flowise_endpoint'])
-        
-        if 'llm_endpoint' in config:
-            llm_client.set_base_url(config['llm_endpoint'])
-        
-        if 'llm_api_key' in config:
-            llm_client.set_api_key(config['llm_api_key'])
-        
-        return jsonify({
-            "message": "Configuration updated successfully",
-            "flowise_endpoint": flowise_client.base_url,
-            "llm_endpoint": llm_client.base_url
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    config = request.json
+    
+    if 'flowise_endpoint' in config:
+        get_flowise_client().set_base_url(config['flowise_endpoint'])
+    
+    if 'llm_endpoint' in config:
+        get_llm_client().set_base_url(config['llm_endpoint'])
+    
+    if 'llm_api_key' in config:
+        get_llm_client().set_api_key(config['llm_api_key'])
+    
+    return jsonify({
+        "message": "Configuration updated successfully",
+        "flowise_endpoint": get_flowise_client().base_url,
+        "llm_endpoint": get_llm_client().base_url
+    })
 
 @flowise_control_bp.route('/test-connection', methods=['POST'])
 @cross_origin()
 def test_connections():
     """Test connections to Flowise and LLM APIs"""
-    try:
-        flowise_test = flowise_client.test_connection()
-        llm_test = llm_client.test_connection()
-        
-        return jsonify({
-            "flowise": flowise_test,
-            "llm": llm_test,
-            "timestamp": datetime.now().isoformat()
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    flowise_test = get_flowise_client().test_connection()
+    llm_test = get_llm_client().test_connection()
+    
+    return jsonify({
+        "flowise": flowise_test,
+        "llm": llm_test,
+        "timestamp": now_iso()
+    })
 
 @flowise_control_bp.route('/chatflows', methods=['GET'])
 @cross_origin()
 def get_chatflows():
     """Get all chatflows from Flowise"""
-    try:
-        result = flowise_client.get_chatflows()
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    # Flowise's JSON is passed through inside the envelope, not parsed and re-encoded
+    return Response(get_flowise_client().get_chatflows_raw(CHATFLOWS_MAX_AGE), mimetype='application/json')
 
 @flowise_control_bp.route('/chatflows/<chatflow_id>', methods=['GET'])
 @cross_origin()
 def get_chatflow(chatflow_id):
     """Get specific chatflow by ID"""
-    try:
-        result = flowise_client.get_chatflow(chatflow_id)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return Response(get_flowise_client().get_chatflow_raw(chatflow_id), mimetype='application/json')
 
 @flowise_control_bp.route('/chatflows', methods=['POST'])
 @cross_origin()
 def create_chatflow():
     """Create new chatflow"""
-    try:
-        chatflow_data = request.json
-        result = flowise_client.create_chatflow(chatflow_data)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    chatflow_data = request.json
+    result = get_flowise_client().create_chatflow(chatflow_data)
+    return jsonify(result)
 
 @flowise_control_bp.route('/chatflows/<chatflow_id>', methods=['PUT'])
 @cross_origin()
 def update_chatflow(chatflow_id):
     """Update existing chatflow"""
-    try:
-        chatflow_data = request.json
-        result = flowise_client.update_chatflow(chatflow_id, chatflow_data)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    chatflow_data = request.json
+    result = get_flowise_client().update_chatflow(chatflow_id, chatflow_data)
+    return jsonify(result)
 
 @flowise_control_bp.route('/chatflows/<chatflow_id>', methods=['DELETE'])
 @cross_origin()
 def delete_chatflow(chatflow_id):
     """Delete chatflow"""
-    try:
-        result = flowise_client.delete_chatflow(chatflow_id)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    result = get_flowise_client().delete_chatflow(chatflow_id)
+    return jsonify(result)
 
 @flowise_control_bp.route('/chatflows/<chatflow_id>/predict', methods=['POST'])
 @cross_origin()
 def predict_chatflow(chatflow_id):
     """Send message to chatflow and get prediction"""
-    try:
-        data = request.json
-        message = data.get('message', '')
-        session_id = data.get('session_id')
-        
-        result = flowise_client.predict_chatflow(chatflow_id, message, session_id)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    data = request.json
+    message = data.get('message', '')
+    session_id = data.get('session_id')
+    
+    result = get_flowise_client().predict_chatflow_raw(chatflow_id, message, session_id)
+    return Response(result, mimetype='application/json')
 
 @flowise_control_bp.route('/chatflows/<chatflow_id>/stats', methods=['GET'])
 @cross_origin()
 def get_chatflow_stats(chatflow_id):
     """Get chatflow statistics"""
-    try:
-        result = flowise_client.get_chatflow_stats(chatflow_id)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    result = get_flowise_client().get_chatflow_stats(chatflow_id)
+    return jsonify(result)
 
 @flowise_control_bp.route('/chatflows/<chatflow_id>/optimize', methods=['POST'])
 @cross_origin()
 def optimize_chatflow(chatflow_id):
     """Analyze and optimize chatflow performance"""
-    try:
-        # Get current chatflow
-        chatflow_result = flowise_client.get_chatflow(chatflow_id)
-        if chatflow_result["status"] != "success":
-            return jsonify(chatflow_result), 400
-        
-        # Use LLM to analyze and optimize
-        optimization_result = llm_client.optimize_flowise_configuration(
-            chatflow_result["data"]
-        )
+    # Get current chatflow
+    chatflow_result = get_flowise_client().get_chatflow(chatflow_id)
+    if chatflow_result["status"] != "success":
+        return jsonify(chatflow_result), 400
+    
+    # Use LLM to analyze and optimize
+    optimization_result = get_llm_client().optimize_flowise_configuration(
+        chatflow_result["data"]
+    )
+    
+    if optimization_result["status"] == "success":
+        # Get performance analysis from Flowise client
+        performance_result = get_flowise_client().optimize_chatflow_performance(chatflow_id)
         
-        if optimization_result["status"] == "success":
-            # Get performance analysis from Flowise client
-            performance_result = flowise_client.optimize_chatflow_performance(chatflow_id)
-            
-            return jsonify({
-                "status": "success",
-                "optimization": optimization_result["data"],
-                "performance_analysis": performance_result.get("data", {}),
-                "timestamp": datetime.now().isoformat()
-            })
-        else:
-            return jsonify(optimization_result), 400
-            
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return jsonify({
+            "status": "success",
+            "optimization": optimization_result["data"],
+            "performance_analysis": performance_result.get("data", {}),
+            "timestamp": now_iso()
+        })
+    else:
+        return jsonify(optimization_result), 400
 
 @flowise_control_bp.route('/chatflows/<chatflow_id>/create-optimized', methods=['POST'])
 @cross_origin()
 def create_optimized_chatflow(chatflow_id):
     """Create optimized version of existing chatflow"""
-    try:
-        optimization_params = request.json
-        
-        result = flowise_client.create_optimized_chatflow(
-            chatflow_id, 
-            optimization_params
-        )
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    optimization_params = request.json
+    
+    result = get_flowise_client().create_optimized_chatflow(
+        chatflow_id, 
+        optimization_params
+    )
+    return jsonify(result)
 
 @flowise_control_bp.route('/llm/models', methods=['GET'])
 @cross_origin()
 def get_llm_models():
     """Get available LLM models"""
-    try:
-        result = llm_client.get_models()
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    result = get_llm_client().get_models()
+    return jsonify(result)
 
 @flowise_control_bp.route('/llm/chat', methods=['POST'])
 @cross_origin()
 def llm_chat():
     """Send chat message to LLM"""
-    try:
-        data = request.json
-        messages = data.get('messages', [])
-        model = data.get('model', 'gpt-3.5-turbo')
-        temperature = data.get('temperature', 0.7)
-        max_tokens = data.get('max_tokens', 1000)
-        
-        result = llm_client.chat_completion(
-            messages, model, temperature, max_tokens
-        )
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    data = request.json
+    messages = data.get('messages', [])
+    model = data.get('model', 'gpt-3.5-turbo')
+    temperature = data.get('temperature', 0.7)
+    max_tokens = data.get('max_tokens', 1000)
+    
+    result = get_llm_client().chat_completion(
+        messages, model, temperature, max_tokens
+    )
+    return jsonify(result)
 
 @flowise_control_bp.route('/llm/analyze-performance', methods=['POST'])
 @cross_origin()
 def llm_analyze_performance():
     """Use LLM to analyze system performance"""
-    try:
-        performance_data = request.json
-        
-        result = llm_client.analyze_system_performance(performance_data)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    performance_data = request.json
+    
+    result = get_llm_client().analyze_system_performance(performance_data)
+    return jsonify(result)
 
 @flowise_control_bp.route('/llm/generate-improvement-plan', methods=['POST'])
 @cross_origin()
 def llm_generate_improvement_plan():
     """Use LLM to generate improvement plan"""
-    try:
-        analysis_data = request.json
-        
-        result = llm_client.generate_improvement_plan(analysis_data)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    analysis_data = request.json
+    
+    result = get_llm_client().generate_improvement_plan(analysis_data)
+    return jsonify(result)
 
 @flowise_control_bp.route('/llm/generate-service', methods=['POST'])
 @cross_origin()
 def llm_generate_service():
     """Use LLM to generate service code"""
+    data = request.json
+    service_type = data.get('service_type', 'generic')
+    requirements = data.get('requirements', {})
+    
+    result = get_llm_client().generate_service_code(service_type, requirements)
+    return jsonify(result)
+
+def _optimize_chatflow(chatflow):
+    """Analyze one chatflow with the LLM and generate its improvement plan"""
+    chatflow_id = chatflow.get("id")
     try:
-        data = request.json
-        service_type = data.get('service_type', 'generic')
-        requirements = data.get('requirements', {})
+        # Get performance stats
+        stats_result = get_flowise_client().get_chatflow_stats(chatflow_id)
+        
+        # Use LLM to analyze performance
+        if stats_result["status"] != "success":
+            return {
+                "chatflow_id": chatflow_id,
+                "status": "stats_failed",
+                "error": stats_result.get("message", "Unknown error")
+            }
         
-        result = llm_client.generate_service_code(service_type, requirements)
-        return jsonify(result)
+        analysis_result = get_llm_client().analyze_system_performance(
+            stats_result["data"]
+        )
+        if analysis_result["status"] != "success":
+            return {
+                "chatflow_id": chatflow_id,
+                "status": "analysis_failed",
+                "error": analysis_result.get("message", "Unknown error")
+            }
+        
+        # Generate improvement plan
+        plan_result = get_llm_client().generate_improvement_plan(
+            analysis_result["data"]
+        )
+        return {
+            "chatflow_id": chatflow_id,
+            "chatflow_name": chatflow.get("name", "Unknown"),
+            "analysis": analysis_result["data"],
+            "improvement_plan": plan_result.get("data", {}),
+            "status": "optimized"
+        }
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return {
+            "chatflow_id": chatflow_id,
+            "status": "error",
+            "error": str(e)
+        }
 
 @flowise_control_bp.route('/auto-optimize', methods=['POST'])
 @cross_origin()
 def auto_optimize_system():
     """Automatically optimize the entire system using AI"""
-    try:
-        # Get all chatflows
-        chatflows_result = flowise_client.get_chatflows()
-        if chatflows_result["status"] != "success":
-            return jsonify(chatflows_result), 400
-        
-        chatflows = chatflows_result["data"]
-        optimization_results = []
-        
-        # Optimize each chatflow
-        for chatflow in chatflows:
-            chatflow_id = chatflow.get("id")
-            if chatflow_id:
-                try:
-                    # Get performance stats
-                    stats_result = flowise_client.get_chatflow_stats(chatflow_id)
-                    
-                    # Use LLM to analyze performance
-                    if stats_result["status"] == "success":
-                        analysis_result = llm_client.analyze_system_performance(
-                            stats_result["data"]
-                        )
-                        
-                        if analysis_result["status"] == "success":
-                            # Generate improvement plan
-                            plan_result = llm_client.generate_improvement_plan(
-                                analysis_result["data"]
-                            )
-                            
-                            optimization_results.append({
-                                "chatflow_id": chatflow_id,
-                                "chatflow_name": chatflow.get("name", "Unknown"),
-                                "analysis": analysis_result["data"],
-                                "improvement_plan": plan_result.get("data", {}),
-                                "status": "optimized"
-                            })
-                        else:
-                            optimization_results.append({
-                                "chatflow_id": chatflow_id,
-                                "status": "analysis_failed",
-                                "error": analysis_result.get("message", "Unknown error")
-                            })
-                    else:
-                        optimization_results.append({
-                            "chatflow_id": chatflow_id,
-                            "status": "stats_failed",
-                            "error": stats_result.get("message", "Unknown error")
-                        })
-                        
-                except Exception as e:
-                    optimization_results.append({
-                        "chatflow_id": chatflow_id,
-                        "status": "error",
-                        "error": str(e)
-                    })
-        
-        return jsonify({
-            "status": "success",
-            "message": "Auto-optimization completed",
-            "results": optimization_results,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    # Get all chatflows
+    chatflows_result = get_flowise_client().get_chatflows()
+    if chatflows_result["status"] != "success":
+        return jsonify(chatflows_result), 400
+    
+    chatflows = [chatflow for chatflow in chatflows_result["data"] if chatflow.get("id")]
+    
+    # Chatflows are independent and the calls are I/O bound, so optimize them concurrently
+    optimization_results = []
+    if chatflows:
+        with ThreadPoolExecutor(max_workers=min(AUTO_OPTIMIZE_WORKERS, len(chatflows))) as executor:
+            optimization_results = list(executor.map(_optimize_chatflow, chatflows))
+    
+    return jsonify({
+        "status": "success",
+        "message": "Auto-optimization completed",
+        "results": optimization_results,
+        "timestamp": now_iso()
+    })
 
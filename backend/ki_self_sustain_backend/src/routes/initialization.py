@@ -1,155 +1,277 @@
-from flask import Blueprint, request, jsonify
-import json
+from flask import Blueprint, request, jsonify, current_app
 import os
+import shutil
 import logging
-from datetime import datetime
+import time
+import orjson
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from src.modules.time_utils import now_iso
 
 initialization_bp = Blueprint('initialization', __name__)
 
-@initialization_bp.route('/initialize', methods=['POST'])
-def initialize_system():
-    """Initialize the KI Self Sustain system with default configurations"""
+def _dump_json(obj):
+    """Indented JSON bytes for the data files (orjson indents natively, unlike json.dump(indent=2))"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+def _write_file(item):
+    """Write one (path, bytes) pair"""
+    path, data = item
+    Path(path).write_bytes(data)
+
+# System log, JSON Lines (one record per line, only ever appended to)
+SYSTEM_LOG = 'data/logs/system.jsonl'
+# Plain log written by installs initialized before the JSON Lines log; still
+# counts as the system log for /status
+LEGACY_SYSTEM_LOG = 'data/logs/system.log'
+
+# Directories created by initialize_system
+INIT_DIRECTORIES = (
+    'data/learning',
+    'data/backups',
+    'data/logs',
+    'data/metrics',
+    'flowise_data/chatflows',
+    'llm_models'
+)
+
+# Initial data files, encoded once at import; initialize_system only fills
+# in the __TS__ timestamp placeholder
+
+# Learning database
+_LEARNING_DB_BYTES = _dump_json({
+    "learning_entries": [],
+    "successful_improvements": 0,
+    "failed_improvements": 0,
+    "total_learning_entries": 0,
+    "success_rate": 0.0,
+    "last_improvement": None,
+    "learning_insights": {
+        "common_patterns": [],
+        "optimization_areas": [],
+        "performance_trends": []
+    }
+})
+
+# System metrics
+_METRICS_TEMPLATE = _dump_json({
+    "system_health": "excellent",
+    "uptime": "0 minutes",
+    "last_check": "__TS__",
+    "performance_metrics": {
+        "cpu_usage": 0.0,
+        "memory_usage": 0.0,
+        "response_time": 0.0,
+        "throughput": 0.0
+    },
+    "component_status": {
+        "backend": "active",
+        "frontend": "active",
+        "flowise": "checking",
+        "llm_service": "checking",
+        "database": "active"
+    }
+})
+
+# Configuration
+_CONFIG_TEMPLATE = _dump_json({
+    "system": {
+        "name": "KI Self Sustain",
+        "version": "1.0.0",
+        "initialized": "__TS__",
+        "environment": "development"
+    },
+    "flowise": {
+        "endpoint": "http://localhost:3000",
+        "api_key": None,
+        "auto_optimize": True,
+        "check_interval": 300
+    },
+    "llm": {
+        "endpoint": "http://localhost:11434",
+        "model": "llama3",
+        "temperature": 0.7,
+        "max_tokens": 1000
+    },
+    "learning": {
+        "auto_improvement": True,
+        "max_improvements_per_hour": 5,
+        "safety_checks": True,
+        "backup_before_changes": True
+    },
+    "security": {
+        "enable_safety_checks": True,
+        "max_execution_time": 30,
+        "alert_threshold": 0.8,
+        "monitoring_enabled": True
+    }
+})
+
+# Initial log entry, one JSON Lines record
+_LOG_TEMPLATE = orjson.dumps({
+    "timestamp": "__TS__",
+    "level": "INFO",
+    "component": "initialization",
+    "message": "KI Self Sustain system successfully initialized",
+    "details": {
+        "directories_created": len(INIT_DIRECTORIES),
+        "config_files_created": 3,
+        "status": "success"
+    }
+}, option=orjson.OPT_APPEND_NEWLINE)
+
+def _backup_tree(src, dst):
+    """Back up a directory as hard links (no data copied), copying if linking is not possible"""
+    try:
+        shutil.copytree(src, dst, copy_function=os.link)
+    except (OSError, shutil.Error):
+        # e.g. cross-device; drop the partial link tree so the copy cannot write through it
+        shutil.rmtree(dst, ignore_errors=True)
+        shutil.copytree(src, dst)
+
+def _backup_file(src, dst):
+    """Back up a file as a hard link, copying if linking is not possible"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+# (path, summarize) -> (mtime_ns, size, summary) of the data files read by the
+# probes; only the derived value is kept, never the parsed file
+_json_cache = {}
+
+def _json_summary(path, summarize=None):
+    """summarize(parsed JSON file), or True if it just parses; re-read only when its mtime
+    or size changed (FileNotFoundError if missing, ValueError if corrupted)"""
+    st = os.stat(path)
+    key = (path, summarize)
+    cached = _json_cache.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    data = orjson.loads(Path(path).read_bytes())
+    summary = True if summarize is None else summarize(data)
+    _json_cache[key] = (st.st_mtime_ns, st.st_size, summary)
+    return summary
+
+def _config_valid(config):
+    return 'system' in config and 'initialized' in config['system']
+
+# (mtime_ns, size, [(path, bytes), ...]) of the split example chatflows file
+_example_chatflows_cache = None
+
+def _example_chatflow_files(path):
+    """(chatflow file, encoded chatflow) pairs from an example file, split and encoded once per file version"""
+    global _example_chatflows_cache
+    st = os.stat(path)
+    cached = _example_chatflows_cache
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    files = [
+        (f"flowise_data/chatflows/{chatflow['id']}.json", _dump_json(chatflow))
+        for chatflow in orjson.loads(Path(path).read_bytes())
+    ]
+    _example_chatflows_cache = (st.st_mtime_ns, st.st_size, files)
+    return files
+
+def _data_entries():
+    """Names directly under data/, read with one scandir"""
+    try:
+        with os.scandir('data') as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+def _path_exists(path, data_entries):
+    """os.path.exists, answered from data_entries for data/ paths where possible"""
+    parts = path.split('/')
+    if parts[0] == 'data':
+        if parts[1] not in data_entries:
+            # Neither the entry nor anything below it exists
+            return False
+        if len(parts) == 2:
+            return True
+    return os.path.exists(path)
+
+# Seconds a /status or /health answer is reused for pollers
+_PROBE_TTL = 5.0
+
+# view name -> (monotonic time, body bytes, status code) of the last probe answer
+_probe_cache = {}
+
+def _cached_probe(view):
+    """Serve a probe route's response from memory for _PROBE_TTL seconds"""
+    @wraps(view)
+    def wrapper():
+        now = time.monotonic()
+        hit = _probe_cache.get(view.__name__)
+        if hit and now - hit[0] < _PROBE_TTL:
+            return current_app.response_class(hit[1], status=hit[2], mimetype='application/json')
+        response = current_app.make_response(view())
+        _probe_cache[view.__name__] = (now, response.get_data(), response.status_code)
+        return response
+    return wrapper
+
+def _do_initialize():
+    """Create the directories and default data files; returns (ok, result info)"""
     try:
         # Create necessary directories
-        directories = [
-            'data/learning',
-            'data/backups',
-            'data/logs',
-            'data/metrics',
-            'flowise_data/chatflows',
-            'llm_models'
-        ]
-        
-        for directory in directories:
+        for directory in INIT_DIRECTORIES:
             os.makedirs(directory, exist_ok=True)
         
-        # Initialize learning database
-        learning_data = {
-            "learning_entries": [],
-            "successful_improvements": 0,
-            "failed_improvements": 0,
-            "total_learning_entries": 0,
-            "success_rate": 0.0,
-            "last_improvement": None,
-            "learning_insights": {
-                "common_patterns": [],
-                "optimization_areas": [],
-                "performance_trends": []
-            }
-        }
-        
-        with open('data/learning/learning_database.json', 'w') as f:
-            json.dump(learning_data, f, indent=2)
-        
-        # Initialize system metrics
-        metrics_data = {
-            "system_health": "excellent",
-            "uptime": "0 minutes",
-            "last_check": datetime.now().isoformat(),
-            "performance_metrics": {
-                "cpu_usage": 0.0,
-                "memory_usage": 0.0,
-                "response_time": 0.0,
-                "throughput": 0.0
-            },
-            "component_status": {
-                "backend": "active",
-                "frontend": "active",
-                "flowise": "checking",
-                "llm_service": "checking",
-                "database": "active"
-            }
-        }
+        # Fill the timestamp into the pre-encoded templates, then write all files in one pass
+        timestamp = now_iso()
+        ts = timestamp.encode()
+        files = [
+            ('data/learning/learning_database.json', _LEARNING_DB_BYTES),
+            ('data/metrics/system_metrics.json', _METRICS_TEMPLATE.replace(b'__TS__', ts)),
+            ('data/config.json', _CONFIG_TEMPLATE.replace(b'__TS__', ts))
+        ]
         
-        with open('data/metrics/system_metrics.json', 'w') as f:
-            json.dump(metrics_data, f, indent=2)
+        # Load example chatflows if available and save them to the chatflows directory
+        example_chatflows_path = 'flowise_data/example_chatflows.json'
+        example_chatflows = []
+        if os.path.exists(example_chatflows_path):
+            example_chatflows = _example_chatflow_files(example_chatflows_path)
+            files.extend(example_chatflows)
         
-        # Initialize configuration
-        config_data = {
-            "system": {
-                "name": "KI Self Sustain",
-                "version": "1.0.0",
-                "initialized": datetime.now().isoformat(),
-                "environment": "development"
-            },
-            "flowise": {
-                "endpoint": "http://localhost:3000",
-                "api_key": None,
-                "auto_optimize": True,
-                "check_interval": 300
-            },
-            "llm": {
-                "endpoint": "http://localhost:11434",
-                "model": "llama3",
-                "temperature": 0.7,
-                "max_tokens": 1000
-            },
-            "learning": {
-                "auto_improvement": True,
-                "max_improvements_per_hour": 5,
-                "safety_checks": True,
-                "backup_before_changes": True
-            },
-            "security": {
-                "enable_safety_checks": True,
-                "max_execution_time": 30,
-                "alert_threshold": 0.8,
-                "monitoring_enabled": True
-            }
-        }
+        with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+            # list() re-raises the first failed write
+            list(executor.map(_write_file, files))
         
-        with open('data/config.json', 'w') as f:
-            json.dump(config_data, f, indent=2)
+        with open(SYSTEM_LOG, 'ab') as f:
+            f.write(_LOG_TEMPLATE.replace(b'__TS__', ts))
         
-        # Create initial log entry
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "level": "INFO",
-            "component": "initialization",
-            "message": "KI Self Sustain system successfully initialized",
-            "details": {
-                "directories_created": len(directories),
-                "config_files_created": 3,
-                "status": "success"
-            }
-        }
+        _probe_cache.clear()
         
-        with open('data/logs/system.log', 'w') as f:
-            json.dump([log_entry], f, indent=2)
-        
-        # Load example chatflows if available
-        example_chatflows_path = 'flowise_data/example_chatflows.json'
-        if os.path.exists(example_chatflows_path):
-            with open(example_chatflows_path, 'r') as f:
-                example_chatflows = json.load(f)
-            
-            # Save to chatflows directory
-            for chatflow in example_chatflows:
-                chatflow_file = f"flowise_data/chatflows/{chatflow['id']}.json"
-                with open(chatflow_file, 'w') as f:
-                    json.dump(chatflow, f, indent=2)
-        
-        return jsonify({
+        return True, {
             "status": "success",
             "message": "System successfully initialized",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "components": {
-                "directories": directories,
+                "directories": INIT_DIRECTORIES,
                 "config_files": ["learning_database.json", "system_metrics.json", "config.json"],
-                "log_files": ["system.log"],
-                "example_chatflows": len(example_chatflows) if 'example_chatflows' in locals() else 0
+                "log_files": [os.path.basename(SYSTEM_LOG)],
+                "example_chatflows": len(example_chatflows)
             }
-        })
+        }
         
     except Exception as e:
         logging.error(f"System initialization failed: {str(e)}")
-        return jsonify({
+        return False, {
             "status": "error",
             "message": f"System initialization failed: {str(e)}",
-            "timestamp": datetime.now().isoformat()
-        }), 500
+            "timestamp": now_iso()
+        }
+
+@initialization_bp.route('/initialize', methods=['POST'])
+def initialize_system():
+    """Initialize the KI Self Sustain system with default configurations"""
+    ok, info = _do_initialize()
+    return jsonify(info), 200 if ok else 500
 
 @initialization_bp.route('/status', methods=['GET'])
+@_cached_probe
 def get_initialization_status():
     """Check if the system is properly initialized"""
     try:
@@ -157,30 +279,24 @@ def get_initialization_status():
             'data/learning/learning_database.json',
             'data/metrics/system_metrics.json',
             'data/config.json',
-            'data/logs/system.log'
-        ]
-        
-        required_directories = [
-            'data/learning',
-            'data/backups',
-            'data/logs',
-            'data/metrics',
-            'flowise_data/chatflows',
-            'llm_models'
+            SYSTEM_LOG
         ]
         
-        missing_files = [f for f in required_files if not os.path.exists(f)]
-        missing_directories = [d for d in required_directories if not os.path.exists(d)]
+        # One scandir of data/ settles the entries directly under it (and, when a
+        # directory is missing, its files) instead of a stat per path
+        data_entries = _data_entries()
+        missing_files = [f for f in required_files if not _path_exists(f, data_entries)]
+        if SYSTEM_LOG in missing_files and _path_exists(LEGACY_SYSTEM_LOG, data_entries):
+            missing_files.remove(SYSTEM_LOG)
+        missing_directories = [d for d in INIT_DIRECTORIES if not _path_exists(d, data_entries)]
         
         is_initialized = len(missing_files) == 0 and len(missing_directories) == 0
         
         # Check configuration
         config_valid = False
-        if os.path.exists('data/config.json'):
+        if 'config.json' in data_entries:
             try:
-                with open('data/config.json', 'r') as f:
-                    config = json.load(f)
-                config_valid = 'system' in config and 'initialized' in config['system']
+                config_valid = _json_summary('data/config.json', _config_valid)
             except:
                 pass
         
@@ -189,7 +305,7 @@ def get_initialization_status():
             "config_valid": config_valid,
             "missing_files": missing_files,
             "missing_directories": missing_directories,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "ready_for_operation": is_initialized and config_valid
         })
         
@@ -198,7 +314,7 @@ def get_initialization_status():
         return jsonify({
             "initialized": False,
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }), 500
 
 @initialization_bp.route('/reset', methods=['POST'])
@@ -214,42 +330,51 @@ def reset_system():
             }), 400
         
         # Create backup before reset
-        backup_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = f"data/backups/reset_backup_{backup_timestamp}"
+        # Nanosecond name: no strftime, and two resets within one second cannot collide
+        backup_dir = f"data/backups/reset_backup_{time.time_ns()}"
         os.makedirs(backup_dir, exist_ok=True)
         
-        # Backup existing data
-        import shutil
+        # Backup existing data (hard links; the originals are unlinked below,
+        # so re-initialization writes new files instead of through the links)
         if os.path.exists('data/learning'):
-            shutil.copytree('data/learning', f"{backup_dir}/learning")
+            _backup_tree('data/learning', f"{backup_dir}/learning")
         if os.path.exists('data/metrics'):
-            shutil.copytree('data/metrics', f"{backup_dir}/metrics")
+            _backup_tree('data/metrics', f"{backup_dir}/metrics")
         if os.path.exists('data/config.json'):
-            shutil.copy2('data/config.json', f"{backup_dir}/config.json")
+            _backup_file('data/config.json', f"{backup_dir}/config.json")
         
-        # Remove existing data
-        import glob
-        for pattern in ['data/learning/*', 'data/metrics/*', 'data/logs/*']:
-            for file in glob.glob(pattern):
-                if os.path.isfile(file):
-                    os.remove(file)
+        # Remove existing data: the backed-up directories as a whole (recreated empty;
+        # a failure aborts the reset), from the unbacked-up data/logs only the files
+        # directly inside it
+        for directory in ('data/learning', 'data/metrics'):
+            if os.path.isdir(directory):
+                shutil.rmtree(directory)
+            os.makedirs(directory, exist_ok=True)
+        if os.path.isdir('data/logs'):
+            with os.scandir('data/logs') as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        os.remove(entry.path)
+        if os.path.isfile('data/config.json'):
+            os.remove('data/config.json')
+        _probe_cache.clear()
         
         # Re-initialize
-        init_response = initialize_system()
+        ok, _ = _do_initialize()
         
-        if init_response[1] == 200:  # Success
+        if ok:
             return jsonify({
                 "status": "success",
                 "message": "System successfully reset and re-initialized",
                 "backup_location": backup_dir,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             })
         else:
             return jsonify({
                 "status": "error",
                 "message": "Reset completed but re-initialization failed",
                 "backup_location": backup_dir,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }), 500
             
     except Exception as e:
@@ -257,65 +382,60 @@ def reset_system():
         return jsonify({
             "status": "error",
             "message": f"System reset failed: {str(e)}",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }), 500
 
 @initialization_bp.route('/health', methods=['GET'])
+@_cached_probe
 def health_check():
     """Comprehensive health check of all system components"""
     try:
         health_status = {
             "overall": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "components": {}
         }
         
-        # Check file system
+        # Check file system (one access() call instead of writing and deleting a probe file)
         try:
-            test_file = 'data/.health_check'
-            with open(test_file, 'w') as f:
-                f.write('test')
-            os.remove(test_file)
+            filesystem_ok = os.access('data', os.W_OK)
+        except OSError:
+            filesystem_ok = False
+        if filesystem_ok:
             health_status["components"]["filesystem"] = "healthy"
-        except:
+        else:
             health_status["components"]["filesystem"] = "unhealthy"
             health_status["overall"] = "degraded"
         
         # Check configuration
         try:
-            if os.path.exists('data/config.json'):
-                with open('data/config.json', 'r') as f:
-                    config = json.load(f)
-                health_status["components"]["configuration"] = "healthy"
-            else:
-                health_status["components"]["configuration"] = "missing"
-                health_status["overall"] = "degraded"
+            _json_summary('data/config.json')
+            health_status["components"]["configuration"] = "healthy"
+        except FileNotFoundError:
+            health_status["components"]["configuration"] = "missing"
+            health_status["overall"] = "degraded"
         except:
             health_status["components"]["configuration"] = "corrupted"
             health_status["overall"] = "degraded"
         
         # Check learning system
         try:
-            if os.path.exists('data/learning/learning_database.json'):
-                with open('data/learning/learning_database.json', 'r') as f:
-                    learning_data = json.load(f)
-                health_status["components"]["learning_system"] = "healthy"
-            else:
-                health_status["components"]["learning_system"] = "missing"
-                health_status["overall"] = "degraded"
+            _json_summary('data/learning/learning_database.json')
+            health_status["components"]["learning_system"] = "healthy"
+        except FileNotFoundError:
+            health_status["components"]["learning_system"] = "missing"
+            health_status["overall"] = "degraded"
         except:
             health_status["components"]["learning_system"] = "corrupted"
             health_status["overall"] = "degraded"
         
         # Check metrics system
         try:
-            if os.path.exists('data/metrics/system_metrics.json'):
-                with open('data/metrics/system_metrics.json', 'r') as f:
-                    metrics_data = json.load(f)
-                health_status["components"]["metrics_system"] = "healthy"
-            else:
-                health_status["components"]["metrics_system"] = "missing"
-                health_status["overall"] = "degraded"
+            _json_summary('data/metrics/system_metrics.json')
+            health_status["components"]["metrics_system"] = "healthy"
+        except FileNotFoundError:
+            health_status["components"]["metrics_system"] = "missing"
+            health_status["overall"] = "degraded"
         except:
             health_status["components"]["metrics_system"] = "corrupted"
             health_status["overall"] = "degraded"
@@ -327,6 +447,6 @@ def health_check():
         return jsonify({
             "overall": "critical",
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }), 500
 
@@ -1,31 +1,193 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, current_app, url_for
 from flask_cors import cross_origin
-import json
+import copy
+import logging
 import os
+import threading
+import time
+import zlib
+from itertools import islice
+import orjson
 from datetime import datetime
 from src.modules.enhanced_ai_manager import EnhancedAIManager
-from src.modules.llm_api_client import LLMAPIClient
+from src.modules.time_utils import now_iso
+from src.modules.scheduler import background_scheduler
+from src.modules.llm_cache import CachingLLMClient, LLMCache
 
 self_learning_bp = Blueprint('self_learning', __name__)
 
 # Initialize enhanced AI manager
 enhanced_ai_manager = EnhancedAIManager()
-llm_client = LLMAPIClient()
+# Near-identical analysis requests within a minute are answered from memory
+llm_client = CachingLLMClient(cache=LLMCache(ttl_seconds=60, max_entries=128))
+
+# Seconds between background refreshes of the metrics and insights snapshots
+SNAPSHOT_REFRESH_INTERVAL = 1.0
+# Seconds a snapshot is served to polling requests; an older one (the refresher
+# is late or not running, e.g. in a forked worker) is rebuilt on the request
+SNAPSHOT_TTL = 2.0
+
+_SNAPSHOT_PRODUCERS = {
+    "insights": enhanced_ai_manager.get_learning_insights,
+    "metrics": enhanced_ai_manager.collect_system_metrics
+}
+
+# name -> (monotonic time, value) of the last snapshot; replaced as a whole tuple,
+# so readers never see a half-updated entry
+_snapshots = {}
+_snapshot_locks = {name: threading.Lock() for name in _SNAPSHOT_PRODUCERS}
+
+def _build_snapshot(name):
+    # Computing under the lock makes concurrent misses wait for one call
+    with _snapshot_locks[name]:
+        value = _SNAPSHOT_PRODUCERS[name]()
+        _snapshots[name] = (time.monotonic(), value)
+        return value
+
+def _snapshot(name):
+    """Last snapshot if younger than SNAPSHOT_TTL; ?fresh=1 asks for a live value"""
+    if request.args.get('fresh') == '1':
+        return _SNAPSHOT_PRODUCERS[name]()
+    hit = _snapshots.get(name)
+    if hit and time.monotonic() - hit[0] < SNAPSHOT_TTL:
+        return hit[1]
+    return _build_snapshot(name)
+
+def _refresh_snapshots():
+    """Rebuild all snapshots off the request path"""
+    for name in _SNAPSHOT_PRODUCERS:
+        _build_snapshot(name)
+
+background_scheduler.schedule_periodic(
+    "learning_snapshots", SNAPSHOT_REFRESH_INTERVAL, _refresh_snapshots
+)
+
+# Scenarios /simulate-learning alternates between: (type, metrics for cycle index i)
+SIMULATION_SCENARIOS = (
+    ("performance_improvement", lambda i: {
+        "response_time": 2.5 - (i * 0.1),
+        "accuracy": 0.85 + (i * 0.02),
+        "user_satisfaction": 0.8 + (i * 0.03)
+    }),
+    ("error_reduction", lambda i: {
+        "error_rate": 0.05 - (i * 0.005),
+        "uptime": 99.0 + (i * 0.1),
+        "stability": 0.9 + (i * 0.01)
+    })
+)
+
+# Page size of /version-history when ?limit is not given, and the largest one allowed
+VERSION_PAGE_SIZE = 50
+VERSION_PAGE_MAX = 500
+
+# Part of every ETag, so tags handed out by an earlier process never match
+_ETAG_PREFIX = f"{os.getpid():x}-{time.time_ns():x}"
+
+# Entries encoded per chunk of a streamed JSON array
+EXPORT_CHUNK_ENTRIES = 256
+
+def _iter_json_object(fields, dumps):
+    """A JSON object as byte chunks; list values are encoded EXPORT_CHUNK_ENTRIES entries at a time
+
+    Everything but the list entries is encoded right here, before the response
+    starts, so a failure there still becomes an error response.
+    """
+    encoded = [(dumps(key), value if isinstance(value, list) else dumps(value)) for key, value in fields]
+    return _json_object_chunks(encoded, dumps)
+
+def _json_object_chunks(encoded, dumps):
+    try:
+        for i, (key, value) in enumerate(encoded):
+            yield (b'{' if i == 0 else b',') + key + b':'
+            if isinstance(value, list):
+                yield b'['
+                for start in range(0, len(value), EXPORT_CHUNK_ENTRIES):
+                    chunk = b','.join(dumps(entry) for entry in value[start:start + EXPORT_CHUNK_ENTRIES])
+                    yield chunk if start == 0 else b',' + chunk
+                yield b']'
+            else:
+                yield value
+        yield b'}'
+    except Exception as e:
+        # The 200 status is already sent; re-raising makes the server drop the
+        # connection, so the client sees a broken transfer, not truncated JSON
+        logging.error(f"Streamed JSON export aborted: {str(e)}")
+        raise
+
+# Responses of these endpoints grow with the learning history; they are gzipped
+# for clients that accept it once they reach GZIP_MIN_SIZE bytes
+GZIP_ENDPOINTS = frozenset((
+    'self_learning.export_learning_data',
+    'self_learning.get_version_history',
+    'self_learning.get_learning_data'
+))
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+def _gzip_chunks(chunks):
+    """Streamed chunks as one gzip stream, compressed as they are produced"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@self_learning_bp.after_request
+def compress_response(response):
+    """Gzip the large read responses (see GZIP_ENDPOINTS)"""
+    if (request.endpoint not in GZIP_ENDPOINTS or response.status_code != 200
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if 'gzip' not in request.accept_encodings:
+        return response
+    if response.is_streamed:
+        response.response = _gzip_chunks(response.response)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < GZIP_MIN_SIZE:
+            return response
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        response.set_data(compressor.compress(data) + compressor.flush())
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def _write_backup(path, data):
+    """Write data to path durably (temp file, fsync, atomic replace); raises on failure"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _learning_insights():
+    return _snapshot("insights")
+
+def _system_metrics():
+    return _snapshot("metrics")
 
 @self_learning_bp.route('/status', methods=['GET'])
 @cross_origin()
 def get_learning_status():
     """Get current self-learning system status"""
     try:
-        learning_insights = enhanced_ai_manager.get_learning_insights()
-        system_metrics = enhanced_ai_manager.collect_system_metrics()
+        learning_insights = _learning_insights()
+        system_metrics = _system_metrics()
         
         return jsonify({
             "status": "active",
             "current_version": enhanced_ai_manager.current_version,
             "learning_insights": learning_insights,
             "system_metrics": system_metrics,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -50,7 +212,7 @@ def trigger_manual_improvement():
         improvement_request = {
             "type": "manual_improvement",
             "user_data": improvement_data,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
         
         result = enhanced_ai_manager.safe_ai_improvement(improvement_request)
@@ -63,7 +225,7 @@ def trigger_manual_improvement():
 def get_learning_data():
     """Get historical learning data"""
     try:
-        learning_insights = enhanced_ai_manager.get_learning_insights()
+        learning_insights = _learning_insights()
         return jsonify(learning_insights)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -73,13 +235,15 @@ def get_learning_data():
 def get_performance_metrics():
     """Get performance metrics"""
     try:
-        metrics = enhanced_ai_manager.performance_metrics
-        system_metrics = enhanced_ai_manager.collect_system_metrics()
+        system_metrics = _system_metrics()
+        # The nested counters are updated in place, so they are copied under the lock
+        with enhanced_ai_manager.state_lock:
+            metrics = copy.deepcopy(enhanced_ai_manager.performance_metrics)
         
         return jsonify({
             "performance_metrics": metrics,
             "current_system_metrics": system_metrics,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -87,14 +251,44 @@ def get_performance_metrics():
 @self_learning_bp.route('/version-history', methods=['GET'])
 @cross_origin()
 def get_version_history():
-    """Get version history"""
+    """Get version history (paged with ?limit=&offset=, oldest first)"""
     try:
-        return jsonify({
+        try:
+            limit = int(request.args.get('limit', VERSION_PAGE_SIZE))
+            offset = int(request.args.get('offset', 0))
+        except ValueError:
+            return jsonify({"error": "limit and offset must be integers"}), 400
+        if not 0 < limit <= VERSION_PAGE_MAX or offset < 0:
+            return jsonify({"error": f"limit must be 1-{VERSION_PAGE_MAX} and offset >= 0"}), 400
+        
+        # The page only changes with the history and the active version; the tag is
+        # taken before the page is read, so a concurrent change can only make it stale
+        etag = f"{_ETAG_PREFIX}-{enhanced_ai_manager.history_revision}-{enhanced_ai_manager.current_version}-{offset}-{limit}"
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers={"ETag": f'W/"{etag}"'})
+        
+        # Only the requested page is copied and encoded; len() of the deque is O(1)
+        history = enhanced_ai_manager.version_history
+        total = len(history)
+        page = list(islice(history, offset, offset + limit))
+        
+        response = jsonify({
             "current_version": enhanced_ai_manager.current_version,
-            "version_history": enhanced_ai_manager.version_history,
-            "total_versions": len(enhanced_ai_manager.version_history),
-            "timestamp": datetime.now().isoformat()
+            "version_history": page,
+            "total_versions": total,
+            "limit": limit,
+            "offset": offset,
+            "timestamp": now_iso()
         })
+        response.set_etag(etag, weak=True)
+        links = []
+        if offset + limit < total:
+            links.append(f'<{url_for(".get_version_history", limit=limit, offset=offset + limit)}>; rel="next"')
+        if offset > 0:
+            links.append(f'<{url_for(".get_version_history", limit=limit, offset=max(offset - limit, 0))}>; rel="prev"')
+        if links:
+            response.headers['Link'] = ', '.join(links)
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -111,21 +305,20 @@ def process_llm_feedback():
         if analysis_result["status"] == "success":
             # Create learning entry from feedback
             learning_entry = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "type": "llm_feedback",
                 "feedback": feedback_data,
                 "analysis": analysis_result["data"],
                 "processed": True
             }
             
-            enhanced_ai_manager.learning_data.append(learning_entry)
-            enhanced_ai_manager.save_learning_data()
+            enhanced_ai_manager.append_learning_entry(learning_entry)
             
             return jsonify({
                 "status": "success",
                 "message": "Feedback processed and learned from",
                 "analysis": analysis_result["data"],
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             })
         else:
             return jsonify({
@@ -148,34 +341,19 @@ def simulate_learning_cycle():
         results = []
         
         for i in range(cycles):
-            # Simulate different scenarios
-            scenarios = [
-                {
-                    "type": "performance_improvement",
-                    "metrics": {
-                        "response_time": 2.5 - (i * 0.1),
-                        "accuracy": 0.85 + (i * 0.02),
-                        "user_satisfaction": 0.8 + (i * 0.03)
-                    }
-                },
-                {
-                    "type": "error_reduction",
-                    "metrics": {
-                        "error_rate": 0.05 - (i * 0.005),
-                        "uptime": 99.0 + (i * 0.1),
-                        "stability": 0.9 + (i * 0.01)
-                    }
-                }
-            ]
-            
-            scenario = scenarios[i % len(scenarios)]
+            # Simulate different scenarios (only the one used in this cycle is built)
+            scenario_type, scenario_metrics = SIMULATION_SCENARIOS[i % len(SIMULATION_SCENARIOS)]
+            scenario = {
+                "type": scenario_type,
+                "metrics": scenario_metrics(i)
+            }
             
             # Process scenario through learning system
             improvement_request = {
                 "type": "simulation",
                 "scenario": scenario,
                 "cycle": i + 1,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
             
             result = enhanced_ai_manager.safe_ai_improvement(improvement_request)
@@ -190,7 +368,7 @@ def simulate_learning_cycle():
             "message": f"Completed {cycles} learning cycles",
             "results": results,
             "final_insights": enhanced_ai_manager.get_learning_insights(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         })
         
     except Exception as e:
@@ -209,40 +387,40 @@ def reset_learning_data():
                 "message": "Confirmation required to reset learning data"
             }), 400
         
-        # Backup current learning data
-        backup_data = {
-            "timestamp": datetime.now().isoformat(),
-            "learning_data": enhanced_ai_manager.learning_data.copy(),
-            "performance_metrics": enhanced_ai_manager.performance_metrics.copy(),
-            "version_history": enhanced_ai_manager.version_history.copy()
-        }
+        backup_tag = datetime.now().strftime('%Y%m%d_%H%M%S')
+        backup_file = f"learning_backup_{backup_tag}.json"
         
-        # Save backup
-        backup_file = f"learning_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        try:
-            with open(backup_file, 'w') as f:
-                json.dump(backup_data, f, indent=2)
-        except Exception as e:
-            return jsonify({
-                "status": "error",
-                "message": f"Failed to create backup: {str(e)}"
-            }), 500
-        
-        # Reset learning data
-        enhanced_ai_manager.learning_data = []
-        enhanced_ai_manager.performance_metrics = {}
-        enhanced_ai_manager.version_history = []
-        enhanced_ai_manager.current_version = "1.0.0"
-        
-        # Save reset state
-        enhanced_ai_manager.save_learning_data()
-        enhanced_ai_manager.save_performance_metrics()
+        # Held from the backup to the reset, so no entry added in between is lost
+        with enhanced_ai_manager.state_lock:
+            # Backup current learning data; reset_learning() rebinds the attributes
+            # instead of clearing them, so the current objects can be used as they are
+            # (the deques are only turned into lists for orjson)
+            backup_data = {
+                "timestamp": now_iso(),
+                "learning_data": list(enhanced_ai_manager.learning_data),
+                "performance_metrics": enhanced_ai_manager.performance_metrics,
+                "version_history": list(enhanced_ai_manager.version_history)
+            }
+            
+            # Save backup durably before anything is reset; a failed write refuses the reset
+            try:
+                _write_backup(backup_file, orjson.dumps(backup_data, option=orjson.OPT_INDENT_2))
+            except Exception as e:
+                return jsonify({
+                    "status": "error",
+                    "message": f"Failed to create backup: {str(e)}"
+                }), 500
+            
+            # Reset learning data and persist the empty state; the complete JSONL
+            # logs are moved aside, not overwritten
+            archived_files = enhanced_ai_manager.reset_learning(backup_tag)
         
         return jsonify({
             "status": "success",
             "message": "Learning data reset successfully",
             "backup_file": backup_file,
-            "timestamp": datetime.now().isoformat()
+            "archived_files": archived_files,
+            "timestamp": now_iso()
         })
         
     except Exception as e:
@@ -253,17 +431,26 @@ def reset_learning_data():
 def export_learning_data():
     """Export learning data for analysis"""
     try:
-        export_data = {
-            "export_timestamp": datetime.now().isoformat(),
-            "current_version": enhanced_ai_manager.current_version,
-            "learning_data": enhanced_ai_manager.learning_data,
-            "performance_metrics": enhanced_ai_manager.performance_metrics,
-            "version_history": enhanced_ai_manager.version_history,
-            "learning_insights": enhanced_ai_manager.get_learning_insights(),
-            "system_metrics": enhanced_ai_manager.collect_system_metrics()
-        }
+        # Copied under the state lock, so all fields belong to the same state: the
+        # lists by reference only, the metrics (updated in place) deeply; entries
+        # appended meanwhile cannot break the iteration of the streamed JSON
+        with enhanced_ai_manager.state_lock:
+            state = (
+                ("current_version", enhanced_ai_manager.current_version),
+                ("learning_data", list(enhanced_ai_manager.learning_data)),
+                ("performance_metrics", copy.deepcopy(enhanced_ai_manager.performance_metrics)),
+                ("version_history", list(enhanced_ai_manager.version_history))
+            )
+        export_fields = (
+            ("export_timestamp", now_iso()),
+            *state,
+            ("learning_insights", _learning_insights()),
+            ("system_metrics", _system_metrics())
+        )
+        provider = current_app.json
+        dumps = lambda obj: orjson.dumps(obj, default=provider.default, option=orjson.OPT_NON_STR_KEYS)
         
-        return jsonify(export_data)
+        return Response(_iter_json_object(export_fields, dumps), mimetype='application/json')
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -273,8 +460,8 @@ def export_learning_data():
 def get_learning_recommendations():
     """Get AI-generated recommendations based on learning data"""
     try:
-        learning_insights = enhanced_ai_manager.get_learning_insights()
-        system_metrics = enhanced_ai_manager.collect_system_metrics()
+        learning_insights = _learning_insights()
+        system_metrics = _system_metrics()
         
         # Use LLM to generate recommendations
         recommendation_request = {
@@ -293,7 +480,7 @@ def get_learning_recommendations():
                     "learning_insights": learning_insights,
                     "system_metrics": system_metrics
                 },
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             })
         else:
             return jsonify({